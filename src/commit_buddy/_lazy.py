@@ -0,0 +1,28 @@
+"""
+Lazy package exports for Commit Buddy.
+"""
+import importlib
+import sys
+from typing import Any, Callable, Dict
+
+def lazy_exports(module_name: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    Build a module __getattr__ (PEP 562) that imports exports on first access.
+
+    Args:
+        module_name: Name of the package the hook is installed in.
+        exports: Exported attribute names mapped to the modules defining them.
+
+    Returns:
+        Callable[[str], Any]: The __getattr__ hook. Resolved values are cached in
+            the package namespace, so each export is imported only once.
+    """
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(exports[name]), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    return __getattr__
@@ -1,83 +1,26 @@
 # src/commit_buddy/callbacks/silent_handler.py
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, List
 
 from langchain.callbacks.base import BaseCallbackHandler
-from langchain.schema import AgentAction, AgentFinish, LLMResult
 
 class SilentCallbackHandler(BaseCallbackHandler):
     """
     Callback handler that captures LLM output but doesn't stream it to stdout.
     This prevents the single-token outputs from appearing in the terminal.
+    Every other event falls through to BaseCallbackHandler's no-op defaults.
     """
 
     def __init__(self):
         """Initialize SilentCallbackHandler."""
         super().__init__()
-        self.text = ""
+        self._parts: List[str] = []
 
-    def on_llm_start(
-        self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any
-    ) -> None:
-        """Run when LLM starts running."""
-        pass
+    @property
+    def text(self) -> str:
+        """Text captured so far."""
+        return "".join(self._parts)
 
     def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         """Run on new LLM token. Only available when streaming is enabled."""
         # Just append to internal buffer without printing
-        self.text += token
-
-    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
-        """Run when LLM ends running."""
-        pass
-
-    def on_llm_error(
-        self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any
-    ) -> None:
-        """Run when LLM errors."""
-        pass
-
-    def on_chain_start(
-        self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs: Any
-    ) -> None:
-        """Run when chain starts running."""
-        pass
-
-    def on_chain_end(self, outputs: Dict[str, Any], **kwargs: Any) -> None:
-        """Run when chain ends running."""
-        pass
-
-    def on_chain_error(
-        self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any
-    ) -> None:
-        """Run when chain errors."""
-        pass
-
-    def on_tool_start(
-        self, serialized: Dict[str, Any], input_str: str, **kwargs: Any
-    ) -> None:
-        """Run when tool starts running."""
-        pass
-
-    def on_agent_action(self, action: AgentAction, **kwargs: Any) -> None:
-        """Run on agent action."""
-        pass
-
-    def on_tool_end(
-        self, output: str, observation_prefix: Optional[str] = None, **kwargs: Any
-    ) -> None:
-        """Run when tool ends running."""
-        pass
-
-    def on_tool_error(
-        self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any
-    ) -> None:
-        """Run when tool errors."""
-        pass
-
-    def on_text(self, text: str, **kwargs: Any) -> None:
-        """Run on arbitrary text."""
-        pass
-
-    def on_agent_finish(self, finish: AgentFinish, **kwargs: Any) -> None:
-        """Run on agent end."""
-        pass
+        self._parts.append(token)
@@ -1,14 +1,29 @@
 """
 LangChain chains for Commit Buddy.
+
+Chains are imported on first access, and they import LangChain inside their
+functions, so the CLI can start without loading it.
 """
+from commit_buddy._lazy import lazy_exports
 
-from commit_buddy.chains.diff_analyzer import analyze_diff
-from commit_buddy.chains.change_splitter import split_changes, LogicalChangeUnit
-from commit_buddy.chains.message_generator import generate_commit_message
+_EXPORTS = {
+    "analyze_diff": "commit_buddy.chains.diff_analyzer",
+    "split_changes": "commit_buddy.chains.change_splitter",
+    "LogicalChangeUnit": "commit_buddy.chains.change_splitter",
+    "analyze_and_split": "commit_buddy.chains.combined_analyzer",
+    "generate_commit_message": "commit_buddy.chains.message_generator",
+    "generate_commit_messages": "commit_buddy.chains.message_generator",
+    "agenerate_commit_messages": "commit_buddy.chains.message_generator",
+}
 
 __all__ = [
     "analyze_diff",
     "split_changes",
     "LogicalChangeUnit",
-    "generate_commit_message"
+    "analyze_and_split",
+    "generate_commit_message",
+    "generate_commit_messages",
+    "agenerate_commit_messages"
 ]
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
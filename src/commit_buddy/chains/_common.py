@@ -0,0 +1,15 @@
+"""
+Helpers shared by the chain modules.
+"""
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from langchain.llms.base import BaseLLM
+
+def resolve_llm(llm: Optional["BaseLLM"]) -> "BaseLLM":
+    """Return llm, or the shared default LLM when it is None."""
+    if llm is None:
+        from commit_buddy.llm.model_loader import get_default_llm
+        llm = get_default_llm()
+
+    return llm
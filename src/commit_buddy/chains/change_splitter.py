@@ -2,18 +2,32 @@
 LangChain chain for splitting git diffs into logical units.
 """
 import json
-from typing import Dict, Any, List, Optional
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Set, Tuple
 
-from langchain.chains.llm import LLMChain
-from langchain.llms.base import BaseLLM
-from langchain.schema.runnable import RunnableSequence
-from langchain.schema.output_parser import StrOutputParser
-from langchain.output_parsers import PydanticOutputParser
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
-from commit_buddy.llm.prompts import CHANGE_SPLITTING_PROMPT
-from commit_buddy.llm.model_loader import load_llm
-from commit_buddy.chains.diff_analyzer import analyze_diff
+from commit_buddy.chains._common import resolve_llm
+from commit_buddy.chains.diff_analyzer import _analyze_summarized
+from commit_buddy.utils.diff_trim import summarize_diff
+
+if TYPE_CHECKING:
+    from langchain.llms.base import BaseLLM
+    from langchain.schema.runnable import RunnableSequence
+
+# orjson is an optional speedup; its JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# File patterns like *.py, *.js, etc. used by the fallback grouping
+_FILE_RE = re.compile(r'[\w\-./]+\.\w+')
+
+# Trailing commas before a closing bracket, including ones followed by whitespace
+_TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
 
 class LogicalChangeUnit(BaseModel):
     """Model for a logical unit of changes."""
@@ -22,11 +36,17 @@ class LogicalChangeUnit(BaseModel):
     explanation: str = Field(description="Brief explanation of what this change accomplishes")
     should_split: bool = Field(description="Whether this logical unit should be split into a separate commit")
 
+    @field_validator("files")
+    @classmethod
+    def normalize_files(cls, files: List[str]) -> List[str]:
+        """Store files sorted and without duplicates, so equal file sets compare equal."""
+        return sorted(set(files))
+
 class LogicalChangeUnits(BaseModel):
     """Model for a list of logical change units."""
     units: List[LogicalChangeUnit] = Field(description="List of logical change units")
 
-def create_change_splitter_chain(llm: Optional[BaseLLM] = None) -> RunnableSequence:
+def create_change_splitter_chain(llm: Optional["BaseLLM"] = None) -> "RunnableSequence":
     """
     Create a LangChain chain for splitting git diffs into logical units.
 
@@ -36,8 +56,11 @@ def create_change_splitter_chain(llm: Optional[BaseLLM] = None) -> RunnableSeque
     Returns:
         RunnableSequence: A chain that takes a diff and analysis and returns logical units.
     """
-    if llm is None:
-        llm = load_llm()
+    from langchain.schema.output_parser import StrOutputParser
+
+    from commit_buddy.llm.prompts import CHANGE_SPLITTING_PROMPT
+
+    llm = resolve_llm(llm)
 
     # Create the chain
     chain = (
@@ -67,15 +90,21 @@ def extract_json_from_text(text: str) -> Optional[str]:
     if start_index == -1:
         return None
 
-    # Find the matching closing bracket
-    open_brackets = 0
-    for i in range(start_index, len(text)):
-        if text[i] == '[':
+    # Find the matching closing bracket, jumping between bracket positions
+    # with str.find instead of stepping through every character
+    open_brackets = 1
+    next_open = text.find('[', start_index + 1)
+    next_close = text.find(']', start_index + 1)
+
+    while next_close != -1:
+        if next_open != -1 and next_open < next_close:
             open_brackets += 1
-        elif text[i] == ']':
+            next_open = text.find('[', next_open + 1)
+        else:
             open_brackets -= 1
             if open_brackets == 0:
-                return text[start_index:i+1]
+                return text[start_index:next_close + 1]
+            next_close = text.find(']', next_close + 1)
 
     return None
 
@@ -96,25 +125,25 @@ def parse_logical_units(units_str: str) -> List[LogicalChangeUnit]:
 
         if json_str:
             # Handle potential trailing commas (common LLM error)
-            json_str = json_str.replace(',]', ']').replace(',}', '}')
-            units_data = json.loads(json_str)
+            json_str = _TRAILING_COMMA_RE.sub(r'\1', json_str)
+            units_data = _json_loads(json_str)
 
             # Create LogicalChangeUnit objects
             units = [LogicalChangeUnit(**unit) for unit in units_data]
 
-            # Deduplicate by checking for units with the same files and similar explanations
+            # Deduplicate by checking for units with the same files and similar explanations.
+            # Units are bucketed by file set so explanations are only compared within a bucket.
             deduplicated_units = []
+            buckets: Dict[Tuple[str, ...], List[Set[str]]] = {}
             for unit in units:
-                is_duplicate = False
-                for existing_unit in deduplicated_units:
-                    # Check if files match and explanations are similar
-                    if set(unit.files) == set(existing_unit.files) and \
-                       similar_explanations(unit.explanation, existing_unit.explanation):
-                        is_duplicate = True
-                        break
+                words = set(unit.explanation.lower().split())
+                bucket = buckets.setdefault(tuple(unit.files), [])  # already sorted and de-duplicated
 
-                if not is_duplicate:
-                    deduplicated_units.append(unit)
+                if any(similar_word_sets(words, existing) for existing in bucket):
+                    continue
+
+                bucket.append(words)
+                deduplicated_units.append(unit)
 
             return deduplicated_units
     except (json.JSONDecodeError, ValueError) as e:
@@ -137,22 +166,16 @@ def create_fallback_units(text: str) -> List[LogicalChangeUnit]:
     Returns:
         List[LogicalChangeUnit]: Simple logical units based on file mentions.
     """
-    import re
-
     # Look for file patterns like *.py, *.js, etc.
-    file_pattern = r'[\w\-./]+\.\w+'
-    files = re.findall(file_pattern, text)
+    files = _FILE_RE.findall(text)
 
     if not files:
         return []
 
     # Group by file extension
-    extension_groups = {}
+    extension_groups = defaultdict(list)
     for file in files:
-        ext = file.split('.')[-1]
-        if ext not in extension_groups:
-            extension_groups[ext] = []
-        extension_groups[ext].append(file)
+        extension_groups[file.rpartition('.')[2]].append(file)
 
     # Create logical units
     units = []
@@ -181,6 +204,23 @@ def similar_explanations(explanation1: str, explanation2: str) -> bool:
     words1 = set(explanation1.lower().split())
     words2 = set(explanation2.lower().split())
 
+    return similar_word_sets(words1, words2)
+
+def similar_word_sets(words1: Set[str], words2: Set[str]) -> bool:
+    """
+    Check if two pre-split explanation word sets are similar enough to be duplicates.
+
+    Args:
+        words1: Lowercased words of the first explanation.
+        words2: Lowercased words of the second explanation.
+
+    Returns:
+        bool: True if the word sets are similar, False otherwise.
+    """
+    # Two empty explanations are trivially the same
+    if not words1 and not words2:
+        return True
+
     # Check what percentage of words are common
     common_words = words1.intersection(words2)
 
@@ -188,22 +228,30 @@ def similar_explanations(explanation1: str, explanation2: str) -> bool:
     similarity = len(common_words) / max(len(words1), len(words2))
     return similarity > 0.7
 
-def split_changes(diff: str, llm: Optional[BaseLLM] = None) -> List[LogicalChangeUnit]:
+def split_changes(
+    diff: str,
+    llm: Optional["BaseLLM"] = None,
+    analysis: Optional[str] = None
+) -> List[LogicalChangeUnit]:
     """
     Split a git diff into logical units of changes.
 
     Args:
         diff: Git diff output.
         llm: LLM to use for the analysis. If None, loads a default LLM.
+        analysis: Existing analysis of the diff. If None, the diff is analyzed first.
 
     Returns:
         List[LogicalChangeUnit]: List of logical change units.
     """
-    if llm is None:
-        llm = load_llm()
+    llm = resolve_llm(llm)
+
+    # Keep the prompt within the model context
+    diff = summarize_diff(diff)
 
-    # First, analyze the diff
-    analysis = analyze_diff(diff, llm)
+    # First, analyze the diff unless the caller already did
+    if analysis is None:
+        analysis = _analyze_summarized(diff, llm)
 
     # Then, split the changes
     chain = create_change_splitter_chain(llm)
@@ -0,0 +1,88 @@
+"""
+LangChain chain for analyzing a git diff and splitting it into logical units in one call.
+"""
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from commit_buddy.chains._common import resolve_llm
+from commit_buddy.chains.change_splitter import LogicalChangeUnit, parse_logical_units
+from commit_buddy.utils.diff_trim import summarize_diff
+
+if TYPE_CHECKING:
+    from langchain.llms.base import BaseLLM
+    from langchain.schema.runnable import RunnableSequence
+
+# Section headings the combined prompt asks the model to reply with
+_ANALYSIS_HEADING = "## Analysis"
+_UNITS_HEADING = "## Units"
+
+def create_combined_analyzer_chain(llm: Optional["BaseLLM"] = None) -> "RunnableSequence":
+    """
+    Create a LangChain chain that analyzes a git diff and splits it into logical units.
+
+    Args:
+        llm: LLM to use for the chain. If None, loads a default LLM.
+
+    Returns:
+        RunnableSequence: A chain that takes a diff and returns the two-section reply.
+    """
+    from langchain.schema.output_parser import StrOutputParser
+
+    from commit_buddy.llm.prompts import ANALYZE_AND_SPLIT_PROMPT
+
+    llm = resolve_llm(llm)
+
+    # Create the chain
+    chain = (
+        {"diff": lambda x: x["diff"]}
+        | ANALYZE_AND_SPLIT_PROMPT
+        | llm
+        | StrOutputParser()
+    )
+
+    return chain
+
+def parse_combined_response(response: str) -> Tuple[str, List[LogicalChangeUnit]]:
+    """
+    Split a combined analyzer reply into the analysis and the logical units.
+
+    Args:
+        response: Raw reply with an "## Analysis" and a "## Units" section.
+
+    Returns:
+        Tuple[str, List[LogicalChangeUnit]]: The analysis text and the parsed units.
+            If the units heading is missing, the whole reply is used as the analysis
+            and searched for the units JSON.
+    """
+    analysis, found, units_str = response.partition(_UNITS_HEADING)
+    if not found:
+        units_str = response
+
+    analysis = analysis.strip()
+    if analysis.startswith(_ANALYSIS_HEADING):
+        analysis = analysis[len(_ANALYSIS_HEADING):].strip()
+
+    return analysis, parse_logical_units(units_str)
+
+def analyze_and_split(
+    diff: str,
+    llm: Optional["BaseLLM"] = None
+) -> Tuple[str, List[LogicalChangeUnit]]:
+    """
+    Analyze a git diff and split it into logical units with a single LLM call.
+
+    Args:
+        diff: Git diff output.
+        llm: LLM to use for the analysis. If None, loads a default LLM.
+
+    Returns:
+        Tuple[str, List[LogicalChangeUnit]]: Analysis of the diff and its logical change units.
+    """
+    llm = resolve_llm(llm)
+
+    # Keep the prompt within the model context
+    diff = summarize_diff(diff)
+
+    chain = create_combined_analyzer_chain(llm)
+    response = chain.invoke({"diff": diff})
+
+    return parse_combined_response(response)
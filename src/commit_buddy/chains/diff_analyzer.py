@@ -1,17 +1,21 @@
 """
 LangChain chain for analyzing git diffs.
 """
-from typing import Dict, Any, Optional
+import hashlib
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple
 
-from langchain.chains.llm import LLMChain
-from langchain.llms.base import BaseLLM
-from langchain.schema.runnable import RunnableSequence
-from langchain.schema.output_parser import StrOutputParser
+from commit_buddy.chains._common import resolve_llm
+from commit_buddy.utils.diff_trim import summarize_diff
 
-from commit_buddy.llm.prompts import DIFF_ANALYSIS_PROMPT
-from commit_buddy.llm.model_loader import load_llm
+if TYPE_CHECKING:
+    from langchain.llms.base import BaseLLM
+    from langchain.schema.runnable import RunnableSequence
 
-def create_diff_analyzer_chain(llm: Optional[BaseLLM] = None) -> RunnableSequence:
+# Analyses keyed by (sha256 of diff, model path), so the same staged diff is
+# only sent through the analyzer once per process
+_ANALYSIS_CACHE: Dict[Tuple[str, str], str] = {}
+
+def create_diff_analyzer_chain(llm: Optional["BaseLLM"] = None) -> "RunnableSequence":
     """
     Create a LangChain chain for analyzing git diffs.
 
@@ -21,8 +25,11 @@ def create_diff_analyzer_chain(llm: Optional[BaseLLM] = None) -> RunnableSequenc
     Returns:
         RunnableSequence: A chain that takes a diff and returns an analysis.
     """
-    if llm is None:
-        llm = load_llm()
+    from langchain.schema.output_parser import StrOutputParser
+
+    from commit_buddy.llm.prompts import DIFF_ANALYSIS_PROMPT
+
+    llm = resolve_llm(llm)
 
     # Create the chain
     chain = (
@@ -34,7 +41,7 @@ def create_diff_analyzer_chain(llm: Optional[BaseLLM] = None) -> RunnableSequenc
 
     return chain
 
-def analyze_diff(diff: str, llm: Optional[BaseLLM] = None) -> str:
+def analyze_diff(diff: str, llm: Optional["BaseLLM"] = None) -> str:
     """
     Analyze a git diff to understand what changes were made.
 
@@ -45,5 +52,31 @@ def analyze_diff(diff: str, llm: Optional[BaseLLM] = None) -> str:
     Returns:
         str: Analysis of the diff.
     """
-    chain = create_diff_analyzer_chain(llm)
-    return chain.invoke({"diff": diff})
+    # Keep the prompt within the model context
+    return _analyze_summarized(summarize_diff(diff), llm)
+
+def _analyze_summarized(diff: str, llm: Optional["BaseLLM"] = None) -> str:
+    """
+    Analyze a diff that has already been summarized to fit the model context.
+
+    Args:
+        diff: Summarized git diff output.
+        llm: LLM to use for the analysis. If None, loads a default LLM.
+
+    Returns:
+        str: Analysis of the diff.
+    """
+    llm = resolve_llm(llm)
+
+    key = (
+        hashlib.sha256(diff.encode("utf-8")).hexdigest(),
+        getattr(llm, "model_path", None) or type(llm).__name__
+    )
+    analysis = _ANALYSIS_CACHE.get(key)
+
+    if analysis is None:
+        chain = create_diff_analyzer_chain(llm)
+        analysis = chain.invoke({"diff": diff})
+        _ANALYSIS_CACHE[key] = analysis
+
+    return analysis
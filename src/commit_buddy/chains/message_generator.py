@@ -1,26 +1,73 @@
 """
 LangChain chain for generating semantic commit messages.
 """
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Tuple
+import asyncio
 import re
 import os
+from collections import Counter
 
-from langchain.chains.llm import LLMChain
-from langchain.llms.base import BaseLLM
-from langchain.schema.runnable import RunnableSequence
-from langchain.schema.output_parser import StrOutputParser
 from rich.console import Console
 
-from commit_buddy.llm.prompts import COMMIT_MESSAGE_PROMPT
-from commit_buddy.llm.model_loader import load_llm
-from commit_buddy.config import CommitBuddyConfig, load_config
+from commit_buddy.chains._common import resolve_llm
+from commit_buddy.config import CommitBuddyConfig, DEFAULT_SEMANTIC_CACHE_PATH, load_config
+from commit_buddy.llm.semantic_cache import SemanticCache
+
+if TYPE_CHECKING:
+    from langchain.llms.base import BaseLLM
+    from langchain.schema.runnable import RunnableSequence
 
 console = Console()
 
+# Created on first use when semantic caching is enabled
+_semantic_cache: Optional[SemanticCache] = None
+
+# Built message generator chains keyed by (id(llm), id(config)); the values
+# keep llm and config alive so their ids cannot be reused by other objects
+_chain_cache: Dict[Tuple[int, int], Tuple["BaseLLM", CommitBuddyConfig, "RunnableSequence"]] = {}
+
+_COMMIT_TYPES = (
+    "feat", "fix", "docs", "style", "refactor",
+    "perf", "test", "build", "ci", "chore", "revert"
+)
+_COMMIT_TYPES_RE = "|".join(_COMMIT_TYPES)
+_MAX_TYPE_LEN = max(len(t) for t in _COMMIT_TYPES)
+
+# Commit types implied by the most common file extension
+_EXT_TO_TYPE = {
+    ".py": "feat", ".js": "feat", ".ts": "feat",
+    ".md": "docs", ".txt": "docs",
+    ".css": "style", ".scss": "style",
+    ".test.js": "test", ".test.ts": "test", ".spec.js": "test", ".test.py": "test",
+}
+_TEST_SUFFIXES = (".test.js", ".test.ts", ".spec.js", ".test.py")
+
+# Match pattern: type(optional_scope): description
+_CONVENTIONAL_RE = re.compile(rf'^({_COMMIT_TYPES_RE})(\([a-z0-9_-]+\))?:\s+.+', re.IGNORECASE)
+
+# Patterns used to fix and clean up LLM output
+_DASHES_RE = re.compile(r'-{3,}')
+_SPLIT_WS_RE = re.compile(r'[\s\(\)]')
+# Prompt echoes dropped by clean_commit_message in a single pass: a leading
+# "Commit message:" label, copied "Now, generate" instructions, and anything
+# from "Example:"/"Example format:" to the end of the message
+_CLEANUP_RE = re.compile(
+    r'\A(?:Commit message:|\s*message:\s*)'
+    r'|Now,\s+generate.*?changes\s+above\.'
+    r'|Example(?:\s+format)?:.*',
+    re.IGNORECASE | re.DOTALL
+)
+# Lowercased substrings that any of clean_commit_message's removals require
+_CLEANUP_MARKERS = ("important:", "example", "now,", "message:")
+# str.translate table deleting inline and fenced code backticks
+_BACKTICKS_TABLE = str.maketrans('', '', '`')
+# Rest of the first "Files changed:"/"Files:" line in a change description
+_FILES_LINE_RE = re.compile(r'(?:Files changed|Files):(.*)')
+
 def create_message_generator_chain(
-    llm: Optional[BaseLLM] = None,
+    llm: Optional["BaseLLM"] = None,
     config: Optional[CommitBuddyConfig] = None
-) -> RunnableSequence:
+) -> "RunnableSequence":
     """
     Create a LangChain chain for generating semantic commit messages.
 
@@ -31,20 +78,26 @@ def create_message_generator_chain(
     Returns:
         RunnableSequence: A chain that takes a change description and returns a commit message.
     """
-    if llm is None:
-        llm = load_llm()
+    from langchain.schema.output_parser import StrOutputParser
+
+    from commit_buddy.llm.prompts import COMMIT_MESSAGE_PROMPT
+
+    llm = resolve_llm(llm)
 
     if config is None:
         config = load_config()
 
+    # Bind the config-derived variables once so each call only supplies the
+    # change description
+    prompt = COMMIT_MESSAGE_PROMPT.partial(
+        commit_types=config.commit_types_csv,
+        commit_scopes=config.commit_scopes_csv
+    )
+
     # Create the chain
     chain = (
-        {
-            "change_description": lambda x: x["change_description"],
-            "commit_types": lambda x: ", ".join(config.commit_types),
-            "commit_scopes": lambda x: ", ".join(config.commit_scopes) if config.commit_scopes else "None specified"
-        }
-        | COMMIT_MESSAGE_PROMPT
+        {"change_description": lambda x: x["change_description"]}
+        | prompt
         | llm
         | StrOutputParser()
     )
@@ -61,9 +114,11 @@ def is_conventional_commit_format(message: str) -> bool:
     Returns:
         bool: True if the message follows the conventional format
     """
-    # Match pattern: type(optional_scope): description
-    pattern = r'^(feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert)(\([a-z0-9_-]+\))?:\s+.+'
-    return bool(re.match(pattern, message, re.IGNORECASE))
+    # Cheap prefix check first; only plausible messages reach the regex
+    if not message[:_MAX_TYPE_LEN].lower().startswith(_COMMIT_TYPES):
+        return False
+
+    return bool(_CONVENTIONAL_RE.match(message))
 
 def extract_changed_files(change_description: str) -> List[str]:
     """
@@ -75,22 +130,63 @@ def extract_changed_files(change_description: str) -> List[str]:
     Returns:
         List[str]: List of changed files
     """
-    files = []
+    # Look for "Files changed:" or similar patterns; the first match wins
+    match = _FILES_LINE_RE.search(change_description)
+    if match is None:
+        return []
+
+    return [f.strip() for f in match.group(1).strip().split(',')]
+
+def get_semantic_cache(config: CommitBuddyConfig) -> SemanticCache:
+    """
+    Get the process-wide semantic cache for commit messages.
+
+    Args:
+        config: Configuration object providing the similarity threshold.
+
+    Returns:
+        SemanticCache: Shared cache persisted under ~/.commitbuddy/semcache.
+    """
+    global _semantic_cache
+
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            DEFAULT_SEMANTIC_CACHE_PATH,
+            threshold=config.semantic_cache_threshold
+        )
+
+    return _semantic_cache
+
+def get_message_generator_chain(
+    llm: Optional["BaseLLM"] = None,
+    config: Optional[CommitBuddyConfig] = None
+) -> "RunnableSequence":
+    """
+    Get a message generator chain, building it only once per LLM and config.
+
+    Args:
+        llm: LLM to use for the chain. If None, uses the shared default LLM.
+        config: Configuration object. If None, loads default config.
+
+    Returns:
+        RunnableSequence: A chain that takes a change description and returns a commit message.
+    """
+    llm = resolve_llm(llm)
+
+    if config is None:
+        config = load_config()
 
-    # Look for "Files changed:" or similar patterns
-    for line in change_description.split('\n'):
-        if "Files changed:" in line or "Files:" in line:
-            parts = re.split(r'Files changed:|Files:', line, 1)
-            if len(parts) > 1:
-                file_list = parts[1].strip()
-                files = [f.strip() for f in file_list.split(',')]
-                break
+    key = (id(llm), id(config))
+    cached = _chain_cache.get(key)
+    if cached is None:
+        cached = (llm, config, create_message_generator_chain(llm, config))
+        _chain_cache[key] = cached
 
-    return files
+    return cached[2]
 
 def generate_commit_message(
     change_description: str,
-    llm: Optional[BaseLLM] = None,
+    llm: Optional["BaseLLM"] = None,
     config: Optional[CommitBuddyConfig] = None
 ) -> str:
     """
@@ -104,35 +200,255 @@ def generate_commit_message(
     Returns:
         str: Generated commit message.
     """
+    if config is None:
+        config = load_config()
+
     # Extract changed files for potential fallback
     files = extract_changed_files(change_description)
 
+    # Reuse the message of a near-identical earlier change if enabled
+    cache = get_semantic_cache(config) if config.semantic_cache else None
+    if cache is not None:
+        cached_message = cache.get(change_description)
+        if cached_message is not None:
+            return _show_if_streaming(cached_message, config)
+
+    echoed = None
     try:
-        # Create the chain and get response
-        chain = create_message_generator_chain(llm, config)
-        response = chain.invoke({"change_description": change_description})
+        # Get the chain and response, echoing tokens as they arrive if
+        # streaming. A token callback is used rather than chain.stream() so that
+        # the LLM response cache still applies; a cached response fires no token
+        # events, so the echoed tokens are collected to know what was shown.
+        from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
+
+        from commit_buddy.callbacks import SilentCallbackHandler
+
+        chain = get_message_generator_chain(llm, config)
+        callbacks = []
+        if config.streaming:
+            echoed = SilentCallbackHandler()
+            callbacks = [StreamingStdOutCallbackHandler(), echoed]
+        response = chain.invoke(
+            {"change_description": change_description},
+            config={"callbacks": callbacks}
+        )
+        if echoed is not None and echoed.text:
+            console.print()
 
         # For debugging
         # console.print(f"[dim]Raw response:[/dim]\n{response}")
 
-        # Clean up the message
-        message = clean_commit_message(response)
+        message = validate_commit_message(response, files)
+        if message is None:
+            # If still not valid, create a fallback message
+            message = generate_fallback_message(files)
+        elif cache is not None:
+            cache.put(change_description, message)
 
-        # Validate message format
-        if not is_conventional_commit_format(message):
-            # Try to fix common issues
-            fixed_message = fix_commit_format(message, files)
-            if is_conventional_commit_format(fixed_message):
-                return fixed_message
+    except Exception as e:
+        console.print(f"[red]Error generating commit message: {str(e)}[/red]")
+        message = generate_fallback_message(files)
 
-            # If still not valid, create a fallback message
-            return generate_fallback_message(files)
+    return _show_if_streaming(message, config, echoed.text if echoed is not None else "")
 
-        return message
+def _show_if_streaming(message: str, config: CommitBuddyConfig, streamed: str = "") -> str:
+    """
+    Print the final message in streaming mode unless it was streamed unchanged.
+
+    Callers don't display a streamed message again, so one that was taken from
+    a cache without streaming, cleaned up or replaced by a fallback is shown
+    here instead.
+
+    Args:
+        message: Commit message that will be returned.
+        config: Configuration object.
+        streamed: Tokens that were echoed to the terminal, if any.
+
+    Returns:
+        str: The message, unchanged.
+    """
+    if config.streaming and message != streamed.strip():
+        console.print("[bold]Commit message:[/bold]")
+        console.print(message, markup=False, highlight=False)
 
+    return message
+
+def generate_commit_messages(
+    change_descriptions: List[str],
+    llm: Optional["BaseLLM"] = None,
+    config: Optional[CommitBuddyConfig] = None
+) -> List[str]:
+    """
+    Generate semantic commit messages for several changes in one batch.
+
+    The chain is built once and all prompts are run through chain.batch, with
+    at most config.n_batch_concurrency running at the same time (always one
+    for LlamaCpp, see _max_concurrency).
+
+    Args:
+        change_descriptions: Descriptions of the changes, one per commit.
+        llm: LLM to use for the generation. If None, loads a default LLM.
+        config: Configuration object. If None, loads default config.
+
+    Returns:
+        List[str]: Generated commit messages, in the same order as the descriptions.
+    """
+    if config is None:
+        config = load_config()
+
+    # Extract changed files for potential fallbacks
+    files_per_change = [extract_changed_files(d) for d in change_descriptions]
+
+    cache = get_semantic_cache(config) if config.semantic_cache else None
+    messages: List[Optional[str]] = [
+        cache.get(d) if cache is not None else None for d in change_descriptions
+    ]
+    pending = [i for i, message in enumerate(messages) if message is None]
+
+    if pending:
+        try:
+            llm = resolve_llm(llm)
+            chain = get_message_generator_chain(llm, config)
+            responses = chain.batch(
+                [{"change_description": change_descriptions[i]} for i in pending],
+                config={"max_concurrency": _max_concurrency(llm, config)},
+                return_exceptions=True
+            )
+        except Exception as e:
+            responses = [e] * len(pending)
+
+        for i, response in zip(pending, responses):
+            message = None
+            if isinstance(response, Exception):
+                console.print(f"[red]Error generating commit message: {str(response)}[/red]")
+            else:
+                message = validate_commit_message(response, files_per_change[i])
+
+            if message is None:
+                messages[i] = generate_fallback_message(files_per_change[i])
+            else:
+                if cache is not None:
+                    cache.put(change_descriptions[i], message)
+                messages[i] = message
+
+    return messages
+
+def _max_concurrency(llm: "BaseLLM", config: CommitBuddyConfig) -> int:
+    """
+    Number of prompts an LLM may run at the same time.
+
+    A LlamaCpp LLM drives a single in-process llama.cpp context, which is not
+    safe to use from several threads, so it always gets one.
+
+    Args:
+        llm: LLM the prompts are run on.
+        config: Configuration object.
+
+    Returns:
+        int: config.n_batch_concurrency, or 1 for LlamaCpp.
+    """
+    from langchain_community.llms.llamacpp import LlamaCpp
+
+    if isinstance(llm, LlamaCpp):
+        return 1
+
+    return max(1, config.n_batch_concurrency)
+
+async def agenerate_commit_messages(
+    change_descriptions: List[str],
+    llm: Optional["BaseLLM"] = None,
+    config: Optional[CommitBuddyConfig] = None
+) -> List[str]:
+    """
+    Generate semantic commit messages for several changes concurrently.
+
+    Each description is sent through chain.ainvoke and awaited with asyncio.gather.
+    A semaphore keeps at most config.n_batch_concurrency generations in flight
+    (always one for LlamaCpp, see _max_concurrency).
+
+    Args:
+        change_descriptions: Descriptions of the changes, one per commit.
+        llm: LLM to use for the generation. If None, loads a default LLM.
+        config: Configuration object. If None, loads default config.
+
+    Returns:
+        List[str]: Generated commit messages, in the same order as the descriptions.
+    """
+    if config is None:
+        config = load_config()
+
+    cache = get_semantic_cache(config) if config.semantic_cache else None
+    try:
+        llm = resolve_llm(llm)
+        chain = get_message_generator_chain(llm, config)
     except Exception as e:
         console.print(f"[red]Error generating commit message: {str(e)}[/red]")
-        return generate_fallback_message(files)
+        return [generate_fallback_message(extract_changed_files(d)) for d in change_descriptions]
+
+    semaphore = asyncio.Semaphore(_max_concurrency(llm, config))
+
+    async def generate_one(change_description: str) -> str:
+        files = extract_changed_files(change_description)
+
+        if cache is not None:
+            cached_message = cache.get(change_description)
+            if cached_message is not None:
+                return cached_message
+
+        try:
+            async with semaphore:
+                response = await chain.ainvoke({"change_description": change_description})
+        except Exception as e:
+            console.print(f"[red]Error generating commit message: {str(e)}[/red]")
+            return generate_fallback_message(files)
+
+        message = validate_commit_message(response, files)
+        if message is None:
+            return generate_fallback_message(files)
+
+        if cache is not None:
+            cache.put(change_description, message)
+
+        return message
+
+    return list(await asyncio.gather(*(generate_one(d) for d in change_descriptions)))
+
+def validate_commit_message(response: str, files: List[str]) -> Optional[str]:
+    """
+    Clean a raw LLM response and make sure it is a conventional commit message.
+
+    Args:
+        response: Raw response from the LLM.
+        files: List of changed files, used when fixing the format.
+
+    Returns:
+        Optional[str]: Valid commit message, or None if it couldn't be fixed.
+    """
+    # Fast path: a single well-formed line with nothing clean_commit_message
+    # would remove is already the final message
+    message = response.strip()
+    if _is_clean_single_line(message) and is_conventional_commit_format(message):
+        return message
+
+    # Clean up the message
+    message = clean_commit_message(response)
+
+    # Validate message format
+    if not is_conventional_commit_format(message):
+        # Try to fix common issues
+        message = fix_commit_format(message, files)
+        if not is_conventional_commit_format(message):
+            return None
+
+    return message
+
+def _is_clean_single_line(message: str) -> bool:
+    """Whether clean_commit_message would leave a stripped message unchanged."""
+    if "\n" in message or "`" in message:
+        return False
+
+    lower_message = message.lower()
+    return not any(marker in lower_message for marker in _CLEANUP_MARKERS)
 
 def fix_commit_format(message: str, files: List[str]) -> str:
     """
@@ -145,21 +461,19 @@ def fix_commit_format(message: str, files: List[str]) -> str:
     Returns:
         str: Fixed commit message
     """
-    commit_types = ["feat", "fix", "docs", "style", "refactor",
-                  "perf", "test", "build", "ci", "chore", "revert"]
-
     # Remove separators that might have been copied from the prompt
-    message = re.sub(r'-{3,}', '', message)
+    message = _DASHES_RE.sub('', message)
+    lower_message = message.lower()
 
     # Check for messages without a type prefix
-    if not any(message.lower().startswith(t) for t in commit_types):
+    if not lower_message.startswith(_COMMIT_TYPES):
         # If it contains a colon anywhere, it might be malformed
         if ':' in message:
             parts = message.split(':', 1)
 
             # Check if the part before colon contains any of the valid types
             before_colon = parts[0].lower()
-            for t in commit_types:
+            for t in _COMMIT_TYPES:
                 if t in before_colon:
                     # Extract the type and add it properly
                     return f"{t}: {parts[1].strip()}"
@@ -173,10 +487,10 @@ def fix_commit_format(message: str, files: List[str]) -> str:
         return f"{file_type}: {message.strip()}"
 
     # Message starts with type but might be malformed
-    for t in commit_types:
-        if message.lower().startswith(t) and not message.lower().startswith(f"{t}:"):
+    for t in _COMMIT_TYPES:
+        if lower_message.startswith(t) and not lower_message.startswith(f"{t}:"):
             # Find where the type ends and add a colon if needed
-            parts = re.split(r'[\s\(\)]', message[len(t):].strip(), 1)
+            parts = _SPLIT_WS_RE.split(message[len(t):].strip(), 1)
             if parts and parts[0]:
                 # Might have a scope
                 if parts[0].startswith('(') and ')' in message:
@@ -200,35 +514,34 @@ def get_file_type_prefix(files: List[str]) -> str:
     Returns:
         str: Appropriate commit type
     """
-    if not files:
-        return "chore"
+    return _commit_type_for_extensions(map(_file_extension, files))
 
-    extensions = [os.path.splitext(f)[1].lower() for f in files if os.path.splitext(f)[1]]
-
-    # Count extension occurrences
-    ext_count = {}
-    for ext in extensions:
-        if ext not in ext_count:
-            ext_count[ext] = 0
-        ext_count[ext] += 1
-
-    # Get most common extension
-    most_common = None
-    if ext_count:
-        most_common = max(ext_count.items(), key=lambda x: x[1])[0]
-
-    # Map extensions to commit types
-    if most_common == '.py' or most_common == '.js' or most_common == '.ts':
-        return "feat"
-    elif most_common == '.md' or most_common == '.txt':
-        return "docs"
-    elif most_common == '.css' or most_common == '.scss':
-        return "style"
-    elif most_common == '.test.js' or most_common == '.test.py' or most_common == '.spec.js':
-        return "test"
-    else:
+def _commit_type_for_extensions(extensions: Iterable[str]) -> str:
+    """Commit type for the most common of the given file extensions."""
+    # Count extension occurrences, treating test files (e.g. foo.test.js) as
+    # their own multi-dot extension
+    ext_count = Counter(ext for ext in extensions if ext)
+
+    if not ext_count:
         return "chore"
 
+    # Map the most common extension to a commit type; on a tie a regular
+    # extension wins over a test suffix, otherwise the first one seen
+    most_common = max(ext_count, key=lambda ext: (ext_count[ext], ext not in _TEST_SUFFIXES))
+    return _EXT_TO_TYPE.get(most_common, "chore")
+
+def _file_extension(file: str) -> str:
+    """Lowercased extension of a file, including multi-dot test suffixes."""
+    lower_file = file.lower()
+    if lower_file.endswith(_TEST_SUFFIXES):
+        return next(suffix for suffix in _TEST_SUFFIXES if lower_file.endswith(suffix))
+
+    return os.path.splitext(lower_file)[1]
+
+def _split_files(files: List[str]) -> List[Tuple[str, str]]:
+    """Pair each file's base name with its extension as given by _file_extension."""
+    return [(os.path.basename(f), _file_extension(f)) for f in files]
+
 def generate_fallback_message(files: List[str]) -> str:
     """
     Generate a fallback commit message based on changed files.
@@ -242,33 +555,23 @@ def generate_fallback_message(files: List[str]) -> str:
     if not files:
         return "chore: update repository files"
 
+    # Split each path once; everything below reads from these pairs
+    split_files = _split_files(files)
+
     # Get prefix based on file types
-    prefix = get_file_type_prefix(files)
+    prefix = _commit_type_for_extensions(ext for _, ext in split_files)
 
     # Generate message based on files
-    if len(files) == 1:
-        filename = os.path.basename(files[0])
-        return f"{prefix}: update {filename}"
-    elif len(files) <= 3:
-        filenames = [os.path.basename(f) for f in files]
-        return f"{prefix}: update {', '.join(filenames)}"
+    if len(files) <= 3:
+        return f"{prefix}: update {', '.join(name for name, _ in split_files)}"
+
+    # Group by file extension, counting foo.test.js as a js file
+    ext_names = {ext.rpartition('.')[2] for _, ext in split_files}
+    if len(ext_names) == 1:
+        ext_name = ext_names.pop() or "(no extension)"
+        return f"{prefix}: update {len(files)} {ext_name} files"
     else:
-        # Group by file extension
-        extensions = {}
-        for file in files:
-            ext = os.path.splitext(file)[1]
-            if not ext:
-                ext = "(no extension)"
-            if ext not in extensions:
-                extensions[ext] = []
-            extensions[ext].append(file)
-
-        if len(extensions) == 1:
-            ext = list(extensions.keys())[0]
-            ext_name = ext[1:] if ext.startswith('.') else ext
-            return f"{prefix}: update {len(files)} {ext_name} files"
-        else:
-            return f"{prefix}: update files across multiple components"
+        return f"{prefix}: update files across multiple components"
 
 def clean_commit_message(message: str) -> str:
     """
@@ -280,11 +583,8 @@ def clean_commit_message(message: str) -> str:
     Returns:
         str: Cleaned commit message.
     """
-    # Remove any triple backticks (code blocks)
-    message = message.replace("```", "")
-
-    # Remove any single backticks (inline code)
-    message = message.replace("`", "")
+    # Remove code block and inline code backticks
+    message = message.translate(_BACKTICKS_TABLE)
 
     # Remove lines with "IMPORTANT:" and surrounding dashes that might have been copied
     lines = message.split('\n')
@@ -293,7 +593,7 @@ def clean_commit_message(message: str) -> str:
     skip_line = False
     for line in lines:
         # Skip lines with separators or IMPORTANT
-        if re.match(r'-{3,}', line.strip()) or "IMPORTANT:" in line:
+        if _DASHES_RE.match(line.strip()) or "IMPORTANT:" in line:
             skip_line = True
             continue
 
@@ -313,17 +613,9 @@ def clean_commit_message(message: str) -> str:
     # Join remaining lines
     message = '\n'.join(cleaned_lines)
 
-    # Remove any "Now, generate" instructions that might have been copied
-    message = re.sub(r'Now,\s+generate.*?changes\s+above\.', '', message, flags=re.IGNORECASE|re.DOTALL)
-
-    # Ensure the message doesn't start with "Commit message:" or similar
-    message = re.sub(r'^(Commit message:|\s*message:\s*)', '', message, flags=re.IGNORECASE).strip()
-
-    # Remove text that begins with "Example:" or "Example format:"
-    message = re.sub(r'Example(\s+format)?:.*$', '', message, flags=re.IGNORECASE|re.DOTALL).strip()
-
-    # Remove leading/trailing whitespace
-    message = message.strip()
+    # Remove a "Commit message:" prefix, copied "Now, generate" instructions
+    # and trailing "Example:" text, then leading/trailing whitespace
+    message = _CLEANUP_RE.sub('', message).strip()
 
     # If message is empty after cleaning, return a fallback
     if not message:
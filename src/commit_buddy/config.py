@@ -2,25 +2,41 @@
 Configuration management for Commit Buddy.
 """
 import os
+import functools
 import yaml
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
 
+# Use the libyaml C bindings when PyYAML was built with them
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 # Default config paths
 DEFAULT_CONFIG_PATH = os.path.expanduser("~/.commitbuddy/config.yaml")
 DEFAULT_MODEL_PATH = os.path.expanduser("~/.commitbuddy/models")
+DEFAULT_LLM_CACHE_PATH = os.path.expanduser("~/.commitbuddy/llm_cache.db")
+DEFAULT_SEMANTIC_CACHE_PATH = os.path.expanduser("~/.commitbuddy/semcache/cache.json")
+
+# 4-bit K-quant GGUF models are the recommended speed/quality trade-off
+DEFAULT_QUANTIZATION = "Q4_K_M"
 
 @dataclass
 class CommitBuddyConfig:
     """Configuration for Commit Buddy."""
     # LLM settings
     model_path: str
+    quantization: str = DEFAULT_QUANTIZATION
     context_length: int = 4096
     temperature: float = 0.2
     max_tokens: int = 1024
     n_gpu_layers: int = 1
     n_batch: int = 512
     n_threads: int = 4
+    streaming: bool = False
+    n_batch_concurrency: int = 1  # ignored for llama.cpp models, which run one prompt at a time
+    prompt_cache_mb: int = 0
 
     # Git settings
     git_command: str = "git"
@@ -28,13 +44,23 @@ class CommitBuddyConfig:
 
     # LangChain settings
     chain_verbose: bool = False
+    cache_backend: str = "memory"  # "none", "memory" or "sqlite"
 
     # Commit message settings
+    semantic_cache: bool = False
+    semantic_cache_threshold: float = 0.85
     commit_types: List[str] = None
     commit_scopes: List[str] = None
 
+    # Prompt-ready forms of commit_types and commit_scopes, derived once
+    commit_types_csv: str = field(init=False, repr=False)
+    commit_scopes_csv: str = field(init=False, repr=False)
+
     def __post_init__(self):
-        """Set default values for commit types and scopes if not provided."""
+        """Expand the model path and set default values for commit types and scopes if not provided."""
+        # Expand "~" once here so every user of model_path gets a usable path
+        self.model_path = os.path.expanduser(self.model_path)
+
         if self.commit_types is None:
             self.commit_types = [
                 "feat", "fix", "docs", "style", "refactor",
@@ -44,10 +70,41 @@ class CommitBuddyConfig:
         if self.commit_scopes is None:
             self.commit_scopes = []
 
+        self.commit_types_csv = ", ".join(self.commit_types)
+        self.commit_scopes_csv = ", ".join(self.commit_scopes) or "None specified"
+
+def find_default_model(quantization: str = DEFAULT_QUANTIZATION) -> str:
+    """
+    Find the model file to use in a new default configuration.
+
+    Args:
+        quantization: Preferred quantization, matched against GGUF file names.
+
+    Returns:
+        str: Path of a matching GGUF model in the models directory if there is
+            one, otherwise the legacy ggml-model.bin path.
+    """
+    suffix = f"{quantization}.gguf".lower()
+
+    try:
+        matches = sorted(f for f in os.listdir(DEFAULT_MODEL_PATH) if f.lower().endswith(suffix))
+    except FileNotFoundError:
+        matches = []
+
+    if matches:
+        return os.path.join(DEFAULT_MODEL_PATH, matches[0])
+
+    return os.path.join(DEFAULT_MODEL_PATH, "ggml-model.bin")
+
 def load_config(config_path: Optional[str] = None) -> CommitBuddyConfig:
     """
     Load configuration from a YAML file.
 
+    Configurations are memoized per expanded path, so every caller in a process
+    shares one mutable CommitBuddyConfig: changes made to it, such as the CLI
+    overrides main() applies, are seen by every later load_config() call for
+    the same path. Use clear_config_cache() to re-read files.
+
     Args:
         config_path: Path to the configuration file. If None, uses default.
 
@@ -58,22 +115,34 @@ def load_config(config_path: Optional[str] = None) -> CommitBuddyConfig:
         config_path = DEFAULT_CONFIG_PATH
 
     # Ensure path is expanded
-    config_path = os.path.expanduser(config_path)
+    return _load_config_cached(os.path.expanduser(config_path))
 
-    # Create default config if it doesn't exist
-    if not os.path.exists(config_path):
-        os.makedirs(os.path.dirname(config_path), exist_ok=True)
-        default_config = {
-            "model_path": os.path.join(DEFAULT_MODEL_PATH, "ggml-model.bin"),
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str) -> CommitBuddyConfig:
+    """Read or create the config file at an expanded path; memoized by load_config."""
+    # Load config from file, creating the default one if it doesn't exist
+    try:
+        with open(config_path, "r") as f:
+            config_data = yaml.load(f, Loader=_YamlLoader)
+    except FileNotFoundError:
+        config_data = {
+            "model_path": find_default_model(),
+            "quantization": DEFAULT_QUANTIZATION,
             "context_length": 4096,
             "temperature": 0.2,
             "max_tokens": 1024,
             "n_gpu_layers": 1,
             "n_batch": 512,
             "n_threads": 4,
+            "streaming": False,
+            "n_batch_concurrency": 1,
+            "prompt_cache_mb": 0,
             "git_command": "git",
             "auto_commit": False,
             "chain_verbose": False,
+            "cache_backend": "memory",
+            "semantic_cache": False,
+            "semantic_cache_threshold": 0.85,
             "commit_types": [
                 "feat", "fix", "docs", "style", "refactor",
                 "perf", "test", "build", "ci", "chore", "revert"
@@ -83,10 +152,10 @@ def load_config(config_path: Optional[str] = None) -> CommitBuddyConfig:
 
         os.makedirs(os.path.dirname(config_path), exist_ok=True)
         with open(config_path, "w") as f:
-            yaml.dump(default_config, f)
-
-    # Load config from file
-    with open(config_path, "r") as f:
-        config_data = yaml.safe_load(f)
+            yaml.dump(config_data, f, Dumper=_YamlDumper)
 
     return CommitBuddyConfig(**config_data)
+
+def clear_config_cache() -> None:
+    """Forget memoized configurations so the next load_config() re-reads the file."""
+    _load_config_cached.cache_clear()
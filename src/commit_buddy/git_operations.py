@@ -10,6 +10,10 @@ from git import Repo, GitCommandError
 
 from commit_buddy.chains.change_splitter import LogicalChangeUnit
 
+# Upper bound on how much diff output is read from git. Anything past this
+# would not fit in the model context anyway.
+MAX_DIFF_SIZE = 256 * 1024
+
 def get_repo(path: Optional[str] = None) -> Repo:
     """
     Get a GitPython Repo object for the current repository.
@@ -28,13 +32,19 @@ def get_repo(path: Optional[str] = None) -> Repo:
 
     return Repo(path)
 
-def get_diff(repo: Optional[Repo] = None, staged: bool = True) -> str:
+def get_diff(
+    repo: Optional[Repo] = None,
+    staged: bool = True,
+    max_size: int = MAX_DIFF_SIZE
+) -> str:
     """
     Get the git diff output.
 
     Args:
         repo: GitPython Repo object. If None, gets the repo from the current directory.
         staged: Whether to get diff for staged changes or all changes.
+        max_size: Maximum number of bytes to read from git. Longer diffs are
+            cut at the last complete line and git is stopped early.
 
     Returns:
         str: Git diff output.
@@ -42,10 +52,51 @@ def get_diff(repo: Optional[Repo] = None, staged: bool = True) -> str:
     if repo is None:
         repo = get_repo()
 
+    args = ["--no-color", "--diff-algorithm=histogram"]
     if staged:
-        return repo.git.diff("--staged")
-    else:
-        return repo.git.diff()
+        args.insert(0, "--staged")
+
+    # Stream the output so huge diffs are never fully materialised
+    proc = repo.git.diff(*args, as_process=True)
+    try:
+        output = proc.stdout.read(max_size + 1)
+
+        if len(output) > max_size:
+            # Drop the partial last line and stop git from producing the rest
+            output = output[:output.rfind(b"\n", 0, max_size) + 1]
+            proc.proc.kill()
+            proc.proc.wait()
+        else:
+            # Raises GitCommandError if git failed
+            proc.wait()
+    finally:
+        proc.stdout.close()
+
+    # Match repo.git.diff(), which strips the trailing newline
+    if output.endswith(b"\n"):
+        output = output[:-1]
+
+    return output.decode("utf-8", errors="replace")
+
+def get_changed_files(repo: Optional[Repo] = None, staged: bool = True) -> List[str]:
+    """
+    Get the names of all changed files, however large the diff is.
+
+    Args:
+        repo: GitPython Repo object. If None, gets the repo from the current directory.
+        staged: Whether to list staged changes or all changes.
+
+    Returns:
+        List[str]: Changed file paths, in git diff order.
+    """
+    if repo is None:
+        repo = get_repo()
+
+    args = ["--name-only"]
+    if staged:
+        args.insert(0, "--staged")
+
+    return repo.git.diff(*args).splitlines()
 
 def stage_files(repo: Optional[Repo] = None, files: List[str] = None) -> None:
     """
@@ -60,9 +111,9 @@ def stage_files(repo: Optional[Repo] = None, files: List[str] = None) -> None:
 
     if files is None:
         repo.git.add("--all")
-    else:
-        for file in files:
-            repo.git.add(file)
+    elif files:
+        # One git process for all files instead of one per file
+        repo.git.add("--", *files)
 
 def commit_changes(repo: Optional[Repo] = None, message: str = "commit") -> None:
     """
@@ -105,12 +156,17 @@ def commit_logical_unit(
         # Reset the staging area
         repo.git.reset()
 
-        # Stage only the files relevant to this logical unit
-        for file in unit.files:
-            try:
-                repo.git.add(file)
-            except GitCommandError as e:
-                print(f"Warning: Could not add file {file}: {e}")
+        # Stage only the files relevant to this logical unit, in one git
+        # call; if any path is rejected, add them one by one so the valid
+        # files are still staged
+        try:
+            stage_files(repo, unit.files)
+        except GitCommandError:
+            for file in unit.files:
+                try:
+                    repo.git.add(file)
+                except GitCommandError as e:
+                    print(f"Warning: Could not add file {file}: {e}")
 
         # Commit the changes
         commit_changes(repo, commit_message)
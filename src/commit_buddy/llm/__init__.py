@@ -1,17 +1,30 @@
 """
-LLM utilities for Commit Buddy.
+LLM utilities for Commit Buddy, imported on first access.
 """
+from commit_buddy._lazy import lazy_exports
 
-from commit_buddy.llm.model_loader import load_llm
-from commit_buddy.llm.prompts import (
-    DIFF_ANALYSIS_PROMPT,
-    CHANGE_SPLITTING_PROMPT,
-    COMMIT_MESSAGE_PROMPT
-)
+_EXPORTS = {
+    "load_llm": "commit_buddy.llm.model_loader",
+    "get_default_llm": "commit_buddy.llm.model_loader",
+    "reset_default_llm": "commit_buddy.llm.model_loader",
+    "clear_llm_cache": "commit_buddy.llm.model_loader",
+    "SemanticCache": "commit_buddy.llm.semantic_cache",
+    "DIFF_ANALYSIS_PROMPT": "commit_buddy.llm.prompts",
+    "CHANGE_SPLITTING_PROMPT": "commit_buddy.llm.prompts",
+    "COMMIT_MESSAGE_PROMPT": "commit_buddy.llm.prompts",
+    "ANALYZE_AND_SPLIT_PROMPT": "commit_buddy.llm.prompts",
+}
 
 __all__ = [
     "load_llm",
+    "get_default_llm",
+    "reset_default_llm",
+    "clear_llm_cache",
+    "SemanticCache",
     "DIFF_ANALYSIS_PROMPT",
     "CHANGE_SPLITTING_PROMPT",
-    "COMMIT_MESSAGE_PROMPT"
+    "COMMIT_MESSAGE_PROMPT",
+    "ANALYZE_AND_SPLIT_PROMPT"
 ]
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
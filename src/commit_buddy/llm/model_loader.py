@@ -1,73 +1,69 @@
 # src/commit_buddy/llm/model_loader.py
 import os
+import re
 import sys
-import io
+import functools
 from contextlib import redirect_stderr, redirect_stdout
-from typing import Any, Dict, List, Optional, Union
+from typing import Optional
 
+from llama_cpp import LlamaRAMCache
+from langchain_community.cache import InMemoryCache, SQLiteCache
 from langchain_community.llms.llamacpp import LlamaCpp
+from langchain.globals import set_llm_cache
 from langchain.callbacks.manager import CallbackManager
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from langchain.callbacks.base import BaseCallbackHandler
-from langchain.schema import AgentAction, AgentFinish, LLMResult
 
-from commit_buddy.config import CommitBuddyConfig, load_config
+from commit_buddy.config import CommitBuddyConfig, DEFAULT_LLM_CACHE_PATH, load_config
 
-# Define the SilentCallbackHandler directly here to avoid import issues
-class SilentCallbackHandler(BaseCallbackHandler):
-    """
-    Callback handler that captures LLM output but doesn't stream it to stdout.
-    """
-
-    def __init__(self):
-        super().__init__()
-        self.text = ""
-
-    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
-        # Just append to internal buffer without printing
-        self.text += token
-
-    # Implement other required methods with just 'pass'
-    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
-        pass
-
-    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
-        pass
-
-    def on_llm_error(self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any) -> None:
-        pass
+# Quantization tag in a model file name (e.g. "Q8_0", "IQ3_XS", "f16")
+_QUANT_TAG_RE = re.compile(r'(?<![a-z0-9])(i?q\d+_[a-z0-9_]+|bf16|f16|f32)(?![a-z0-9])', re.IGNORECASE)
+# 4- and 5-bit K-quants, which need no hint
+_FAST_QUANT_RE = re.compile(r'q[45]_k(?:_[sml])?$', re.IGNORECASE)
 
-    def on_chain_start(self, serialized: Dict[str, Any], inputs: Dict[str, Any], **kwargs: Any) -> None:
-        pass
+# Whether the global LangChain LLM cache has been set up for this process
+_llm_cache_configured = False
 
-    def on_chain_end(self, outputs: Dict[str, Any], **kwargs: Any) -> None:
-        pass
-
-    def on_chain_error(self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any) -> None:
-        pass
-
-    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
-        pass
-
-    def on_agent_action(self, action: AgentAction, **kwargs: Any) -> None:
-        pass
+def configure_llm_cache(config: CommitBuddyConfig) -> None:
+    """
+    Set up LangChain's global LLM response cache once per process.
 
-    def on_tool_end(self, output: str, observation_prefix: Optional[str] = None, **kwargs: Any) -> None:
-        pass
+    Repeated prompts are then answered from the cache instead of running the
+    model again. With "sqlite" this holds across runs, so re-running on the same
+    staged diff returns the same message rather than a new sample.
 
-    def on_tool_error(self, error: Union[Exception, KeyboardInterrupt], **kwargs: Any) -> None:
-        pass
+    Args:
+        config: CommitBuddyConfig object. Its cache_backend selects "none",
+            "memory" or "sqlite" (persisted under ~/.commitbuddy).
 
-    def on_text(self, text: str, **kwargs: Any) -> None:
-        pass
+    Raises:
+        ValueError: If cache_backend is not a known backend.
+    """
+    global _llm_cache_configured
+
+    if _llm_cache_configured:
+        return
+
+    if config.cache_backend == "sqlite":
+        os.makedirs(os.path.dirname(DEFAULT_LLM_CACHE_PATH), exist_ok=True)
+        set_llm_cache(SQLiteCache(database_path=DEFAULT_LLM_CACHE_PATH))
+    elif config.cache_backend == "memory":
+        set_llm_cache(InMemoryCache())
+    elif config.cache_backend != "none":
+        raise ValueError(
+            f"Unknown cache_backend '{config.cache_backend}'. "
+            f"Expected one of: none, memory, sqlite."
+        )
 
-    def on_agent_finish(self, finish: AgentFinish, **kwargs: Any) -> None:
-        pass
+    _llm_cache_configured = True
 
 def load_llm(config: Optional[CommitBuddyConfig] = None, silent: bool = True) -> LlamaCpp:
     """
     Load a LlamaCpp model for use with LangChain.
 
+    Loaded models are memoized on the settings that affect them, so repeated
+    calls with the same configuration reuse the model instead of re-mapping
+    the model file. Use clear_llm_cache() to force a reload.
+
     Args:
         config: CommitBuddyConfig object. If None, loads default config.
         silent: Whether to suppress token generation output. Default is True.
@@ -78,47 +74,106 @@ def load_llm(config: Optional[CommitBuddyConfig] = None, silent: bool = True) ->
     if config is None:
         config = load_config()
 
+    configure_llm_cache(config)
+
+    return _load_llm_cached(
+        config.model_path,
+        config.quantization,
+        config.temperature,
+        config.max_tokens,
+        config.context_length,
+        config.n_gpu_layers,
+        config.n_batch,
+        config.n_threads,
+        config.streaming,
+        config.prompt_cache_mb,
+        silent
+    )
+
+@functools.lru_cache(maxsize=1)
+def _load_llm_cached(
+    model_path: str,
+    quantization: str,
+    temperature: float,
+    max_tokens: int,
+    n_ctx: int,
+    n_gpu_layers: int,
+    n_batch: int,
+    n_threads: int,
+    streaming: bool,
+    prompt_cache_mb: int,
+    silent: bool
+) -> LlamaCpp:
+    """Load a LlamaCpp model; memoized by load_llm on its arguments."""
     # Make sure the model exists
-    # Ensure path is properly expanded
-    model_path = os.path.expanduser(config.model_path)
     print(f"Looking for model at: {model_path}")
 
     if not os.path.exists(model_path):
         raise FileNotFoundError(
-            f"Model file not found at {config.model_path}. "
+            f"Model file not found at {model_path}. "
             f"Please download a model and place it at this location, "
             f"or update your configuration to point to the correct location."
         )
 
-    # Create callback manager based on silent flag
-    if silent:
-        # Use our custom silent callback handler
-        callback_manager = CallbackManager([SilentCallbackHandler()])
-    else:
-        # Use the standard streaming handler
-        callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
+    # llama.cpp reads the quantization from the GGUF header; this is only a hint
+    # for file names that name a slower quantization than a 4/5-bit K-quant
+    tag = _QUANT_TAG_RE.search(os.path.basename(model_path))
+    if tag and tag.group(1).lower() != quantization.lower() and not _FAST_QUANT_RE.match(tag.group(1)):
+        print(
+            f"Note: model file looks {tag.group(1)} quantized. "
+            f"A 4- or 5-bit K-quant GGUF (Q4_K_M/Q5_K_M) is usually much faster."
+        )
 
-    # Suppress stderr and stdout during model loading to avoid the initialization warnings
-    stderr_capture = io.StringIO()
-    stdout_capture = io.StringIO()
+    # Only attach a handler when tokens should be echoed; without one nothing
+    # is printed, so silent mode needs no callbacks at all
+    callback_manager = None if silent else CallbackManager([StreamingStdOutCallbackHandler()])
 
+    # Suppress stderr and stdout during model loading to avoid the initialization
+    # warnings; they are never read, so discard them instead of buffering them
     try:
-        with redirect_stderr(stderr_capture), redirect_stdout(stdout_capture):
+        with open(os.devnull, "w") as devnull, redirect_stderr(devnull), redirect_stdout(devnull):
             # Load the model
             llm = LlamaCpp(
-                model_path=os.path.expanduser(config.model_path),
-                temperature=config.temperature,
-                max_tokens=config.max_tokens,
-                n_ctx=config.context_length,
-                n_gpu_layers=config.n_gpu_layers,
-                n_batch=config.n_batch,
+                model_path=model_path,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                n_ctx=n_ctx,
+                n_gpu_layers=n_gpu_layers,
+                n_batch=n_batch,
                 callback_manager=callback_manager,
                 verbose=False,  # Force verbose to False to avoid extra output
-                n_threads=config.n_threads,
+                n_threads=n_threads,
+                streaming=streaming,
             )
     except Exception as e:
         # Re-raise any exceptions
         print(f"Error loading model: {str(e)}")
         raise
 
+    # Keep KV states of recent prompts so a later prompt sharing a prefix with
+    # any of them (e.g. the static commit message rules) skips re-evaluating it.
+    # Opt-in: every completion copies the full context state into the cache
+    if prompt_cache_mb > 0:
+        llm.client.set_cache(LlamaRAMCache(capacity_bytes=prompt_cache_mb * 1024 * 1024))
+
     return llm
+
+def clear_llm_cache() -> None:
+    """Drop memoized models so the next load_llm() call loads the model again."""
+    _load_llm_cached.cache_clear()
+
+def get_default_llm() -> LlamaCpp:
+    """
+    Get the LLM used when a chain is called without one.
+
+    The model is loaded from the default config on first use. Later calls hit
+    the load_llm cache, so every chain shares the same model.
+
+    Returns:
+        LlamaCpp: Shared default model.
+    """
+    return load_llm()
+
+def reset_default_llm() -> None:
+    """Drop the shared default LLM so the next use reloads it, e.g. after a config change."""
+    clear_llm_cache()
@@ -71,41 +71,68 @@ CHANGE_SPLITTING_PROMPT = PromptTemplate(
     template=CHANGE_SPLITTING_TEMPLATE
 )
 
-# Fixed prompt with the example clearly separated
-COMMIT_MESSAGE_TEMPLATE = """
-You are an expert Git commit message writer. Your job is to analyze code changes and write a concise, informative commit message.
+# Prompt for analyzing a git diff and splitting it into logical units in one reply
+ANALYZE_AND_SPLIT_TEMPLATE = """
+You are an expert software engineer tasked with analyzing git diffs and organizing the changes into logical units for separate commits.
 
-The code changes to analyze are:
+Git diff:
 ```
-{change_description}
+{diff}
 ```
 
-Write ONE conventional commit message for THESE CHANGES.
+Reply with exactly two sections, in this order.
 
-Available commit types: {commit_types}
-Available scopes: {commit_scopes}
+## Analysis
+A CONCISE analysis of the changes, focusing on:
+1. What files were changed
+2. A summary of each file's changes
+3. The overall purpose of these changes
 
-Format your message like this:
+## Units
+ONLY VALID JSON, no additional text. Group files that serve a single purpose or implement a related feature/fix.
+For each logical unit, provide:
+1. A descriptive name (brief but clear)
+2. The files involved
+3. A brief explanation of what this change accomplishes (1-2 sentences maximum)
+4. Whether it should be split into a separate commit
+
+[
+  {{
+    "name": "Name of logical unit 1",
+    "files": ["file1.py", "file2.py"],
+    "explanation": "Brief explanation of what this change does",
+    "should_split": true/false
+  }},
+  // More logical units...
+]
+"""
+
+ANALYZE_AND_SPLIT_PROMPT = PromptTemplate(
+    input_variables=["diff"],
+    template=ANALYZE_AND_SPLIT_TEMPLATE
+)
+
+# Static instructions come first and the change description last, so the
+# shared prefix is identical across calls and shorter to prefill
+COMMIT_MESSAGE_TEMPLATE = """
+You are an expert Git commit message writer. Write ONE conventional commit message for the code changes below.
+
+Format:
 <type>[(scope)]: <description>
 
 [optional body explaining why the change was made]
 
 Rules:
-1. Choose ONE type from: {commit_types}
-2. Scope is optional, choose from: {commit_scopes}
-3. First line should be < 50 characters
-4. Use imperative present tense ("add" not "adds")
-5. No period at end of first line
-6. Optional body should explain WHY, not HOW
-
-DO NOT:
-- Include any "Example:" or "Format:" text
-- Add "Commit message:" prefix
-- Include any separators (---)
-- Make multiple commit messages
-- Reply with anything other than the commit message itself
-
-IMPORTANT: YOUR ENTIRE RESPONSE SHOULD BE JUST THE COMMIT MESSAGE. DO NOT INCLUDE COMMENTARY.
+1. Type is one of: {commit_types}
+2. Scope is optional, one of: {commit_scopes}
+3. First line < 50 characters, imperative present tense ("add" not "adds"), no period at end
+4. Optional body explains WHY, not HOW
+5. Output only the commit message.
+
+Code changes:
+```
+{change_description}
+```
 """
 
 COMMIT_MESSAGE_PROMPT = PromptTemplate(
@@ -0,0 +1,111 @@
+"""
+Near-duplicate cache for generated commit messages.
+"""
+import json
+import os
+import re
+from typing import FrozenSet, List, Optional, Tuple
+
+# Identifier-like words; digits are dropped so line numbers and hunk offsets
+# don't make otherwise identical changes look different
+_WORD_RE = re.compile(r'[a-z_][a-z_.\-/]*')
+
+class SemanticCache:
+    """
+    Cache mapping change descriptions to commit messages by word-set similarity.
+
+    A lookup returns the message stored for the most similar earlier description,
+    as long as the Jaccard similarity of their word sets reaches the threshold.
+    Entries are kept in least-recently-used order and persisted as JSON.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.85, max_entries: int = 256):
+        """
+        Initialize SemanticCache.
+
+        Args:
+            path: JSON file used to persist the cache.
+            threshold: Minimum Jaccard similarity for a cache hit.
+            max_entries: Maximum number of entries kept.
+        """
+        self.path = os.path.expanduser(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: Optional[List[Tuple[FrozenSet[str], str]]] = None
+
+    @staticmethod
+    def _words(text: str) -> FrozenSet[str]:
+        """Normalize text into the word set used for comparison."""
+        return frozenset(_WORD_RE.findall(text.lower()))
+
+    def _load(self) -> List[Tuple[FrozenSet[str], str]]:
+        """Load entries from disk on first use."""
+        if self._entries is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._entries = [(frozenset(e["words"]), e["message"]) for e in data]
+            except (FileNotFoundError, ValueError, KeyError, TypeError):
+                self._entries = []
+
+        return self._entries
+
+    def _save(self) -> None:
+        """Write entries to disk."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(
+                [{"words": sorted(words), "message": message} for words, message in self._load()],
+                f
+            )
+
+    def get(self, description: str) -> Optional[str]:
+        """
+        Look up a commit message for a change description.
+
+        Args:
+            description: Description of the changes.
+
+        Returns:
+            Optional[str]: Cached commit message, or None on a miss.
+        """
+        words = self._words(description)
+        if not words:
+            return None
+
+        entries = self._load()
+        best_index, best_score = -1, 0.0
+        for i, (cached_words, _) in enumerate(entries):
+            score = len(words & cached_words) / len(words | cached_words)
+            if score > best_score:
+                best_index, best_score = i, score
+
+        if best_score < self.threshold:
+            return None
+
+        # Move the hit to the most recently used position
+        entry = entries.pop(best_index)
+        entries.append(entry)
+        return entry[1]
+
+    def put(self, description: str, message: str) -> None:
+        """
+        Store the commit message generated for a change description.
+
+        Args:
+            description: Description of the changes.
+            message: Generated commit message.
+        """
+        words = self._words(description)
+        if not words:
+            return
+
+        entries = self._load()
+        entries.append((words, message))
+        del entries[:-self.max_entries]
+
+        try:
+            self._save()
+        except OSError:
+            # The cache is an optimization; never fail generation over it
+            pass
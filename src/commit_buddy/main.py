@@ -1,10 +1,13 @@
 """
 Main entry point for Commit Buddy with improved logging.
 """
+import contextlib
+import io
 import os
+import re
 import sys
 import argparse
-from typing import List, Dict, Any, Optional, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -12,27 +15,35 @@ from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 from rich.table import Table
 
-from commit_buddy.config import load_config
-from commit_buddy.llm.model_loader import load_llm
-from commit_buddy.git_operations import (
-    get_repo, get_diff, commit_logical_unit
-)
-from commit_buddy.chains.diff_analyzer import analyze_diff
-from commit_buddy.chains.change_splitter import split_changes, LogicalChangeUnit
-from commit_buddy.chains.message_generator import generate_commit_message
+from commit_buddy.config import CommitBuddyConfig, load_config
+from commit_buddy.utils.diff_trim import trim_diff
 from commit_buddy.utils.formatters import (
     format_diff_analysis, format_logical_units,
     format_commit_message, format_error, format_success
 )
 
+# GitPython, llama.cpp and LangChain are imported where they are first needed,
+# so --help and --show-config don't pay for loading them
+if TYPE_CHECKING:
+    from commit_buddy.chains.change_splitter import LogicalChangeUnit
+
 console = Console()
 
-def parse_arguments() -> argparse.Namespace:
+# Diffs larger than this are parsed with regex scans instead of a line loop
+LARGE_DIFF_SIZE = 64 * 1024
+
+_DIFF_HEADER_RE = re.compile(r'^diff --git ([^ \n]*)', re.MULTILINE)
+# Added lines, excluding the +++ file header (and, like the line loop, any
+# added line whose content itself starts with ++)
+_ADDED_LINE_RE = re.compile(r'^\+(?!\+\+)(.*)', re.MULTILINE)
+
+def parse_arguments() -> Tuple[argparse.Namespace, CommitBuddyConfig]:
     """
-    Parse command line arguments.
+    Parse command line arguments, taking their defaults from the config file.
 
     Returns:
-        argparse.Namespace: Parsed arguments.
+        Tuple[argparse.Namespace, CommitBuddyConfig]: Parsed arguments, and the
+            configuration loaded from --config (or the default path).
     """
     parser = argparse.ArgumentParser(
         description="AI-Powered Git Commit Assistant with LangChain"
@@ -62,13 +73,13 @@ def parse_arguments() -> argparse.Namespace:
 
     parser.add_argument(
         "--auto-commit", "-ac",
-        action="store_true",
+        action=argparse.BooleanOptionalAction,
         help="Automatically commit changes without confirmation"
     )
 
     parser.add_argument(
         "--verbose", "-v",
-        action="store_true",
+        action=argparse.BooleanOptionalAction,
         help="Enable verbose output"
     )
 
@@ -84,76 +95,109 @@ def parse_arguments() -> argparse.Namespace:
         help="Number of layers to run on GPU (for Metal/CUDA acceleration)"
     )
 
-    return parser.parse_args()
+    # The config file supplies the defaults of the flags that override it, so
+    # find --config first and then parse everything against those defaults
+    known_args, _ = parser.parse_known_args()
+    config = load_config(known_args.config)
+
+    parser.set_defaults(
+        model=config.model_path,
+        auto_commit=config.auto_commit,
+        verbose=config.chain_verbose,
+        gpu_layers=config.n_gpu_layers
+    )
 
-def extract_files_from_diff(diff: str) -> List[str]:
+    return parser.parse_args(), config
+
+def parse_diff(diff: str) -> Tuple[List[str], Dict[str, List[str]]]:
     """
-    Extract file names from a git diff.
+    Extract the changed files and a simple summary of changes per file from a git diff.
+
+    Diffs over LARGE_DIFF_SIZE characters are handed to _parse_large_diff. There
+    is no line cap here: the work is bounded by the input, which main() reads
+    through get_diff and so is at most MAX_DIFF_SIZE (256 KiB).
 
     Args:
         diff: Git diff content
 
     Returns:
-        List[str]: List of file names
+        Tuple[List[str], Dict[str, List[str]]]: File names in diff order, and the
+            added lines of each file, without their trailing newline
     """
+    if len(diff) > LARGE_DIFF_SIZE:
+        return _parse_large_diff(diff)
+
     files = []
-    for line in diff.split('\n'):
+    changes = {}
+    current_file = None
+
+    # Iterate the lines in one pass without building a list of them
+    for line in io.StringIO(diff):
         if line.startswith('diff --git'):
-            parts = line.split(' ')
+            parts = line.split(' ', 3)
             if len(parts) >= 3:
-                file_path = parts[2][2:]  # Remove 'a/' prefix
-                files.append(file_path)
-    return files
+                current_file = parts[2][2:].rstrip('\n')  # Remove 'a/' prefix
+                files.append(current_file)
+                changes[current_file] = []
+        elif current_file and line[:1] == '+' and line[:3] != '+++':
+            # Only track additions for simplicity; lines keep their whitespace
+            # (stripped only when shown) but not the newline, as in _parse_large_diff
+            changes[current_file].append(line[1:].rstrip('\n'))
 
-def summarize_changes(diff: str) -> Dict[str, List[str]]:
+    return files, changes
+
+def _parse_large_diff(diff: str) -> Tuple[List[str], Dict[str, List[str]]]:
     """
-    Create a simple summary of changes per file.
+    parse_diff for large diffs, without a Python-level loop over every line.
+
+    File headers are found in one regex pass over the whole diff, and each
+    file's added lines are collected with one findall over its section.
 
     Args:
         diff: Git diff content
 
     Returns:
-        Dict[str, List[str]]: Summary of changes per file
+        Tuple[List[str], Dict[str, List[str]]]: Same as parse_diff.
     """
-    current_file = None
+    files = []
     changes = {}
 
-    for line in diff.split('\n'):
-        if line.startswith('diff --git'):
-            parts = line.split(' ')
-            if len(parts) >= 3:
-                current_file = parts[2][2:]  # Remove 'a/' prefix
-                changes[current_file] = []
-        elif current_file and line.startswith('+') and not line.startswith('+++'):
-            # Only track additions for simplicity
-            changes[current_file].append(line[1:].strip())
+    headers = list(_DIFF_HEADER_RE.finditer(diff))
+    for header, next_header in zip(headers, headers[1:] + [None]):
+        current_file = header.group(1)[2:]  # Remove 'a/' prefix
+        end = next_header.start() if next_header else len(diff)
+
+        files.append(current_file)
+        changes[current_file] = _ADDED_LINE_RE.findall(diff, header.end(), end) if current_file else []
 
-    return changes
+    return files, changes
 
-def generate_single_commit_message(diff: str, llm, config) -> str:
+def generate_single_commit_message(
+    files: List[str],
+    changes_summary: Dict[str, List[str]],
+    llm,
+    config
+) -> str:
     """
     Generate a single commit message for all changes without detailed analysis.
 
     Args:
-        diff: Git diff content
+        files: Changed files, as returned by parse_diff
+        changes_summary: Added lines per file, as returned by parse_diff
         llm: LLM to use for generation
         config: Configuration object
 
     Returns:
         str: Generated commit message
     """
-    files = extract_files_from_diff(diff)
-
     # Create a simple description
     file_list = ", ".join(files[:10])  # Limit to first 10 files
     if len(files) > 10:
         file_list += f" and {len(files) - 10} more files"
 
-    # Get a summary of changes
-    changes_summary = summarize_changes(diff)
-
-    # Create a description that summarizes the changes
-    description = f"Changes to the following files: {file_list}\n\n"
+    # Create a description that summarizes the changes, collecting the
+    # pieces in a list and joining once instead of growing a string
+    parts = [f"Changes to the following files: {file_list}\n\n"]
 
     # Add a summary of changes for each file
     for file, changes in changes_summary.items():
@@ -163,40 +207,43 @@ def generate_single_commit_message(diff: str, llm, config) -> str:
             if len(changes) > 5:
                 change_summary.append(f"... and {len(changes) - 5} more changes")
 
-            description += f"\nFile: {file}\n"
+            parts.append(f"\nFile: {file}\n")
             for change in change_summary:
+                change = change.strip()
                 if len(change) > 80:
                     change = change[:77] + "..."
-                description += f"  + {change}\n"
+                parts.append(f"  + {change}\n")
 
     # Generate commit message
-    return generate_commit_message(description, llm, config)
+    from commit_buddy.chains.message_generator import generate_commit_message
+
+    return generate_commit_message("".join(parts), llm, config)
+
+def describe_logical_unit(unit: "LogicalChangeUnit") -> str:
+    """
+    Build the change description used to generate a logical unit's commit message.
+
+    Args:
+        unit: LogicalChangeUnit object.
+
+    Returns:
+        str: Change description for the message generator.
+    """
+    return f"# {unit.name}\n\n{unit.explanation}\n\nFiles changed: {', '.join(unit.files)}"
 
 def handle_logical_unit(
-    unit: LogicalChangeUnit,
-    llm,
-    config,
+    unit: "LogicalChangeUnit",
+    commit_message: str,
     auto_commit: bool = False
 ) -> None:
     """
-    Handle a logical change unit, generating a commit message and optionally committing it.
+    Handle a logical change unit, displaying its commit message and optionally committing it.
 
     Args:
         unit: LogicalChangeUnit object.
-        llm: LLM to use for generation.
-        config: Configuration object.
+        commit_message: Commit message generated for the unit.
         auto_commit: Whether to automatically commit without confirmation.
     """
-    # Generate a commit message
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[bold blue]Generating commit message for logical unit...[/bold blue]"),
-        transient=True,
-    ) as progress:
-        progress.add_task("generate", total=None)
-        change_description = f"# {unit.name}\n\n{unit.explanation}\n\nFiles changed: {', '.join(unit.files)}"
-        commit_message = generate_commit_message(change_description, llm, config)
-
     # Display the commit message
     format_commit_message(commit_message)
 
@@ -207,25 +254,52 @@ def handle_logical_unit(
 
     # Commit the changes
     try:
+        from commit_buddy.git_operations import get_repo, commit_logical_unit
+
         repo = get_repo()
         success = commit_logical_unit(unit, commit_message, repo)
 
         if success:
-            format_success(f"Successfully committed: {commit_message.splitlines()[0]}")
+            subject = commit_message.split('\n', 1)[0]
+            format_success(f"Successfully committed: {subject}")
         else:
             format_error("Failed to commit changes.")
     except Exception as e:
         format_error(f"Error committing changes: {e}")
 
-def display_file_changes_summary(diff: str) -> None:
+def generation_status(config, description: str):
     """
-    Display a summary of the file changes.
+    Context manager shown while a single commit message is generated.
+
+    A transient spinner captures stdout while it runs, which would break streamed
+    tokens apart, so in streaming mode only a status line is printed.
 
     Args:
-        diff: Git diff content
+        config: Configuration object.
+        description: Text describing the current step.
+
+    Returns:
+        Progress spinner, or a no-op context manager when streaming.
+    """
+    if config.streaming:
+        console.print(f"[bold blue]{description}[/bold blue]")
+        return contextlib.nullcontext()
+
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn(f"[bold blue]{description}[/bold blue]"),
+        transient=True,
+    )
+    progress.add_task("generate", total=None)
+    return progress
+
+def display_file_changes_summary(files: List[str]) -> None:
     """
-    files = extract_files_from_diff(diff)
+    Display a summary of the file changes.
 
+    Args:
+        files: Changed files, as returned by parse_diff
+    """
     table = Table(title="Files Changed")
     table.add_column("File", style="cyan")
     table.add_column("Extension", style="green")
@@ -238,38 +312,39 @@ def display_file_changes_summary(diff: str) -> None:
 
 def main() -> None:
     """Main entry point for Commit Buddy."""
-    args = parse_arguments()
-
-    # Add debugging option
-    if args.verbose:
-        console.print(f"Running with arguments: {args}")
-
     try:
-        # Load configuration
-        config = load_config(args.config)
-
-        # Override config with command line arguments
-        if args.model:
-            config.model_path = os.path.expanduser(args.model)
+        # Parse arguments and load the configuration they default from
+        args, config = parse_arguments()
 
+        # Add debugging option
         if args.verbose:
-            config.chain_verbose = True
-
-        if args.auto_commit:
-            config.auto_commit = True
+            console.print(f"Running with arguments: {args}")
 
-        if args.gpu_layers is not None:
-            config.n_gpu_layers = args.gpu_layers
+        if args.gpu_layers != config.n_gpu_layers:
             console.print(f"[blue]Setting GPU layers to {args.gpu_layers}[/blue]")
 
+        # Apply the arguments; unset flags already hold the config values.
+        # Only a --model given on the command line can still contain "~".
+        # The config is the memoized one, so later load_config() calls in this
+        # process (e.g. in the chains) see these overrides too.
+        if args.model != config.model_path:
+            config.model_path = os.path.expanduser(args.model)
+        config.chain_verbose = args.verbose
+        config.auto_commit = args.auto_commit
+        config.n_gpu_layers = args.gpu_layers
+
         # Show configuration and exit if requested
         if args.show_config:
             console.print("[bold]Current Configuration:[/bold]")
             import yaml
-            console.print(yaml.dump(config.__dict__))
+            from dataclasses import fields
+
+            # Only settings that can be configured, not the values derived from them
+            settings = {f.name: getattr(config, f.name) for f in fields(config) if f.init}
+            console.print(yaml.dump(settings))
 
             # Check if model file exists
-            model_path = os.path.expanduser(config.model_path)
+            model_path = config.model_path
             if os.path.exists(model_path):
                 console.print(f"[green]Model file exists at: {model_path}[/green]")
                 console.print(f"File size: {os.path.getsize(model_path) / (1024*1024):.2f} MB")
@@ -278,6 +353,11 @@ def main() -> None:
 
             return
 
+        from commit_buddy.llm.model_loader import load_llm
+        from commit_buddy.git_operations import MAX_DIFF_SIZE, get_repo, get_diff, get_changed_files
+        from commit_buddy.chains.combined_analyzer import analyze_and_split
+        from commit_buddy.chains.message_generator import generate_commit_messages
+
         # Load LLM
         with Progress(
             SpinnerColumn(),
@@ -290,29 +370,42 @@ def main() -> None:
         # Get git repository
         repo = get_repo()
 
-        # Get diff
-        diff = get_diff(repo, not args.unstaged)
+        raw_diff = get_diff(repo, not args.unstaged)
 
-        if not diff:
+        if not raw_diff:
             console.print("[yellow]No changes detected.[/yellow]")
             return
 
+        # Parse the untrimmed diff once; the summary and the single-message
+        # paths share it
+        files, changes_summary = parse_diff(raw_diff)
+
+        # get_diff stops reading at MAX_DIFF_SIZE, so files past that point are
+        # missing from the parsed diff; list them from git without their changes
+        all_files = get_changed_files(repo, not args.unstaged)
+        if len(all_files) > len(files):
+            console.print(
+                f"[yellow]Diff is larger than {MAX_DIFF_SIZE // 1024} KiB; "
+                f"{len(all_files) - len(files)} files are listed without their changes.[/yellow]"
+            )
+            files = all_files
+
+        # Only the text sent to the LLM drops generated files and oversized hunks
+        diff = trim_diff(raw_diff)
+
         # Display a summary of file changes
-        display_file_changes_summary(diff)
+        display_file_changes_summary(files)
 
         # If we're analyzing already staged changes (no --unstaged flag),
         # we'll prioritize a simpler workflow
         if not args.unstaged:
             # Quickly generate a commit message without detailed analysis
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]Analyzing staged changes and generating commit message...[/bold blue]"),
-                transient=True,
-            ) as progress:
-                progress.add_task("analyze", total=None)
-                commit_message = generate_single_commit_message(diff, llm, config)
+            with generation_status(config, "Analyzing staged changes and generating commit message..."):
+                commit_message = generate_single_commit_message(files, changes_summary, llm, config)
 
-            format_commit_message(commit_message)
+            # A streamed message has already been printed
+            if not config.streaming:
+                format_commit_message(commit_message)
 
             # Ask for confirmation if not auto-commit
             if not args.auto_commit:
@@ -322,52 +415,45 @@ def main() -> None:
             # Commit the changes (all staged files)
             try:
                 repo.git.commit("-m", commit_message)
-                format_success(f"Successfully committed: {commit_message.splitlines()[0]}")
+                subject = commit_message.split('\n', 1)[0]
+                format_success(f"Successfully committed: {subject}")
                 return
             except Exception as e:
                 format_error(f"Error committing changes: {e}")
                 return
 
-        # For unstaged changes or if explicitly analyzing, do the full workflow
+        # For unstaged changes or if explicitly analyzing, do the full workflow.
+        # The analysis and the logical units come from a single LLM call.
         with Progress(
             SpinnerColumn(),
-            TextColumn("[bold blue]Analyzing changes...[/bold blue]"),
+            TextColumn("[bold blue]Analyzing changes and splitting them into logical units...[/bold blue]"),
             transient=True,
         ) as progress:
             progress.add_task("analyze", total=None)
-            analysis = analyze_diff(diff, llm)
+            analysis, logical_units = analyze_and_split(diff, llm)
 
         # Display analysis result
         if args.verbose:
             format_diff_analysis(analysis)
         else:
             # Show a compact summary in non-verbose mode
-            analysis_summary = "\n".join(analysis.split("\n")[:5])
-            if len(analysis.split("\n")) > 5:
+            # A bounded split stops after the sixth line, which only tells
+            # whether there is more to elide
+            analysis_lines = analysis.split("\n", 5)
+            analysis_summary = "\n".join(analysis_lines[:5])
+            if len(analysis_lines) > 5:
                 analysis_summary += "\n..."
             console.print(Panel(analysis_summary, title="Analysis Summary", border_style="blue"))
 
-        # Split changes into logical units
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[bold blue]Splitting changes into logical units...[/bold blue]"),
-            transient=True,
-        ) as progress:
-            progress.add_task("split", total=None)
-            logical_units = split_changes(diff, llm)
-
         if not logical_units:
             console.print("[yellow]No logical units identified. Generating a single commit message instead.[/yellow]")
 
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[bold blue]Generating commit message...[/bold blue]"),
-                transient=True,
-            ) as progress:
-                progress.add_task("generate", total=None)
-                commit_message = generate_single_commit_message(diff, llm, config)
+            with generation_status(config, "Generating commit message..."):
+                commit_message = generate_single_commit_message(files, changes_summary, llm, config)
 
-            format_commit_message(commit_message)
+            # A streamed message has already been printed
+            if not config.streaming:
+                format_commit_message(commit_message)
 
             # Ask for confirmation if not auto-commit
             if not args.auto_commit:
@@ -377,7 +463,8 @@ def main() -> None:
             # Commit the changes (all staged files)
             try:
                 repo.git.commit("-m", commit_message)
-                format_success(f"Successfully committed: {commit_message.splitlines()[0]}")
+                subject = commit_message.split('\n', 1)[0]
+                format_success(f"Successfully committed: {subject}")
             except Exception as e:
                 format_error(f"Error committing changes: {e}")
 
@@ -389,18 +476,38 @@ def main() -> None:
         if args.analyze:
             return
 
+        # Generate the commit messages of all distinct units in one batch, so
+        # the model runs them back to back instead of once per loop iteration
+        units_by_files = {}
+        for unit in logical_units:
+            units_by_files.setdefault(tuple(unit.files), unit)
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[bold blue]Generating commit messages for logical units...[/bold blue]"),
+            transient=True,
+        ) as progress:
+            progress.add_task("generate", total=None)
+            messages = generate_commit_messages(
+                [describe_logical_unit(unit) for unit in units_by_files.values()],
+                llm,
+                config
+            )
+        unit_messages = dict(zip(units_by_files, messages))
+
         # Process each logical unit
         processed_units = set()  # Track which files we've already committed
 
         for i, unit in enumerate(logical_units):
-            # Skip units that have the same files as ones we've already committed
-            unit_files = frozenset(unit.files)
+            # Skip units that have the same files as ones we've already committed;
+            # unit.files is already sorted and de-duplicated by LogicalChangeUnit
+            unit_files = tuple(unit.files)
             if unit_files in processed_units:
                 console.print(f"[yellow]Skipping unit {i+1}/{len(logical_units)}: {unit.name} (already committed these files)[/yellow]")
                 continue
 
             console.print(f"\n[bold]Processing unit {i+1}/{len(logical_units)}: {unit.name}[/bold]")
-            handle_logical_unit(unit, llm, config, args.auto_commit)
+            handle_logical_unit(unit, unit_messages[unit_files], args.auto_commit)
 
             # Track that we've processed these files
             processed_units.add(unit_files)
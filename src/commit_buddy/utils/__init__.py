@@ -1,15 +1,18 @@
 """
-Utility functions for Commit Buddy.
+Utility functions for Commit Buddy, imported on first access.
 """
+from commit_buddy._lazy import lazy_exports
 
-from commit_buddy.utils.formatters import (
-    format_diff_analysis,
-    format_logical_units,
-    format_commit_message,
-    format_error,
-    format_success,
-    format_file_diff
-)
+_EXPORTS = {
+    "format_diff_analysis": "commit_buddy.utils.formatters",
+    "format_logical_units": "commit_buddy.utils.formatters",
+    "format_commit_message": "commit_buddy.utils.formatters",
+    "format_error": "commit_buddy.utils.formatters",
+    "format_success": "commit_buddy.utils.formatters",
+    "format_file_diff": "commit_buddy.utils.formatters",
+    "summarize_diff": "commit_buddy.utils.diff_trim",
+    "trim_diff": "commit_buddy.utils.diff_trim",
+}
 
 __all__ = [
     "format_diff_analysis",
@@ -17,5 +20,9 @@ __all__ = [
     "format_commit_message",
     "format_error",
     "format_success",
-    "format_file_diff"
+    "format_file_diff",
+    "summarize_diff",
+    "trim_diff"
 ]
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
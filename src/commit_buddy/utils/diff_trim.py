@@ -0,0 +1,245 @@
+"""
+Utilities for shrinking git diffs before they are sent to the LLM.
+"""
+import re
+from typing import Collection, Dict, List, Tuple
+
+# Roughly 2k tokens, leaving room in the default 4096-token context for the
+# prompt text, the previous analysis and the model's reply
+DEFAULT_MAX_DIFF_CHARS = 8000
+
+# Maximum score a single file can get, so one huge file can't crowd out the rest
+_MAX_FILE_SCORE = 200
+
+# Smallest remainder of the budget worth filling with part of a file
+_MIN_PARTIAL_CHARS = 200
+
+# Appended to a file section cut short by summarize_diff
+_TRUNCATED_MARKER = "... ({} more lines not shown)\n"
+
+# Number of dropped file names listed in the truncation footer
+_MAX_LISTED_FILES = 20
+
+# Upper bound on the size of a trimmed diff, in characters
+DEFAULT_MAX_TRIMMED_SIZE = 256 * 1024
+
+# Lines kept per file by trim_diff, including the file headers
+_MAX_FILE_LINES = 200
+
+_FILE_HEADER_RE = re.compile(r'^diff --git ', re.MULTILINE)
+
+# Lockfiles, minified bundles, source maps and build/vendor output, whose
+# contents say little about the change but cost many tokens
+_NOISE_FILE_RE = re.compile(
+    r'(?:^|/)(?:package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|Cargo\.lock)$'
+    r'|\.min\.(?:js|css)$'
+    r'|\.map$'
+    r'|(?:^|/)(?:dist|vendor)/'
+)
+
+def split_diff_files(diff: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split a git diff into per-file sections.
+
+    Args:
+        diff: Git diff output.
+
+    Returns:
+        Tuple[str, List[Tuple[str, str]]]: Any text before the first file header,
+            and a list of (file name, section text) pairs in diff order.
+    """
+    starts = [m.start() for m in _FILE_HEADER_RE.finditer(diff)]
+    if not starts:
+        return diff, []
+
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(diff)]):
+        section = diff[start:end]
+        header = section.split('\n', 1)[0].split(' ')
+        file_path = header[2][2:] if len(header) >= 3 else ""  # Remove 'a/' prefix
+        sections.append((file_path, section))
+
+    return diff[:starts[0]], sections
+
+def count_changed_lines(section: str) -> int:
+    """
+    Count added and removed lines in a diff section.
+
+    Args:
+        section: Diff text for a single file.
+
+    Returns:
+        int: Number of changed lines, excluding the ---/+++ file headers.
+    """
+    changed = section.count('\n+') + section.count('\n-')
+    return changed - section.count('\n+++ ') - section.count('\n--- ')
+
+def summarize_diff(diff: str, max_chars: int = DEFAULT_MAX_DIFF_CHARS) -> str:
+    """
+    Shrink a diff to fit a character budget by keeping the most changed files.
+
+    Files are ranked by their number of changed lines (capped per file) and
+    included greedily while they fit the budget. Files too large for what is
+    left are cut at a line boundary instead, so the most changed file is
+    always at least partly shown. Kept files stay in diff order, and a
+    footer names the files that were dropped.
+
+    Args:
+        diff: Git diff output.
+        max_chars: Character budget for the returned diff.
+
+    Returns:
+        str: The original diff if it fits, otherwise the summarized diff, which is
+            never longer than max_chars.
+    """
+    if len(diff) <= max_chars:
+        return diff
+
+    preamble, sections = split_diff_files(diff)
+    if not sections:
+        return diff[:max_chars]
+
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: min(count_changed_lines(sections[i][1]), _MAX_FILE_SCORE),
+        reverse=True
+    )
+
+    # Reserve room for the footer; a smaller budget can only drop more files,
+    # so grow the reservation until the footer fits
+    footer = ""
+    for _ in range(len(sections) + 1):
+        kept = _fill_budget(sections, ranked, max_chars - len(preamble) - len(footer))
+        needed = _dropped_files_footer(sections, kept)
+        if len(needed) <= len(footer):
+            break
+        footer = needed
+
+    parts = [preamble]
+    parts.extend(kept[i] for i in range(len(sections)) if i in kept)
+    parts.append(_dropped_files_footer(sections, kept))
+
+    # The output must fit so that summarizing it again is a no-op
+    return "".join(parts)[:max_chars]
+
+def _fill_budget(sections: List[Tuple[str, str]], ranked: List[int], budget: int) -> Dict[int, str]:
+    """
+    Pick the diff text kept for each file, most changed files first.
+
+    Files that fit whole are taken first, holding back half the budget once a
+    more changed file has been skipped. What is left is then filled with the
+    skipped files, cut at a line boundary.
+
+    Args:
+        sections: (file path, diff text) pairs of the full diff.
+        ranked: Section indices, most changed first.
+        budget: Characters available for file sections.
+
+    Returns:
+        Dict[int, str]: Kept text per section index.
+    """
+    kept: Dict[int, str] = {}
+    skipped = []
+    reserve = 0
+    for i in ranked:
+        section = sections[i][1]
+        if len(section) <= budget - reserve:
+            kept[i] = section
+            budget -= len(section)
+        else:
+            skipped.append(i)
+            reserve = budget // 2
+
+    for i in skipped:
+        # Cut a file down only if a useful part fits or nothing is shown yet
+        if kept and budget < _MIN_PARTIAL_CHARS:
+            break
+        section = _truncate_section(sections[i][1], budget)
+        if section:
+            kept[i] = section
+            budget -= len(section)
+
+    return kept
+
+def _truncate_section(section: str, limit: int) -> str:
+    """
+    Cut a file section at a line boundary and note how many lines were left out.
+
+    Args:
+        section: Diff text for a single file.
+        limit: Maximum length of the returned text.
+
+    Returns:
+        str: The shortened section, or an empty string if not even one line fits.
+    """
+    marker_len = len(_TRUNCATED_MARKER.format(section.count('\n') + 1))
+    if limit <= marker_len:
+        return ""
+
+    cut = section.rfind('\n', 0, limit - marker_len) + 1
+    if cut <= 0:
+        return ""
+
+    rest = section[cut:]
+    omitted = rest.count('\n') + (0 if rest.endswith('\n') else 1)
+    return section[:cut] + _TRUNCATED_MARKER.format(omitted)
+
+def _dropped_files_footer(sections: List[Tuple[str, str]], keep: Collection[int]) -> str:
+    """
+    Build the footer naming the files a summarized diff leaves out.
+
+    Args:
+        sections: (file path, diff text) pairs of the full diff.
+        keep: Indices of the sections that are kept.
+
+    Returns:
+        str: The footer, or an empty string if no file is dropped.
+    """
+    dropped = [file_path for i, (file_path, _) in enumerate(sections) if i not in keep]
+    if not dropped:
+        return ""
+
+    listed = ", ".join(dropped[:_MAX_LISTED_FILES])
+    if len(dropped) > _MAX_LISTED_FILES:
+        listed += f" and {len(dropped) - _MAX_LISTED_FILES} more"
+    return f"\n(+{len(dropped)} more files not shown: {listed})\n"
+
+def trim_diff(diff: str, max_size: int = DEFAULT_MAX_TRIMMED_SIZE) -> str:
+    """
+    Drop noise from a diff before it is parsed or sent to the LLM.
+
+    Generated and vendored files (lockfiles, minified bundles, source maps,
+    dist/ and vendor/ paths) keep only their headers, every other file is cut
+    to its first lines, and the result is capped at max_size characters.
+
+    Args:
+        diff: Git diff output.
+        max_size: Maximum size of the returned diff, in characters.
+
+    Returns:
+        str: The trimmed diff.
+    """
+    preamble, sections = split_diff_files(diff)
+
+    parts = [preamble]
+    for file_path, section in sections:
+        if _NOISE_FILE_RE.search(file_path):
+            # Keep the headers up to the first hunk so the file is still listed
+            hunk_start = section.find('\n@@')
+            if hunk_start != -1:
+                section = section[:hunk_start + 1] + "(contents omitted: generated or vendored file)\n"
+        else:
+            lines = section.split('\n', _MAX_FILE_LINES)
+            if len(lines) > _MAX_FILE_LINES and lines[-1].strip():
+                omitted = lines[-1].rstrip('\n').count('\n') + 1
+                lines[-1] = f"... ({omitted} more lines not shown)\n"
+                section = '\n'.join(lines)
+        parts.append(section)
+
+    trimmed = "".join(parts)
+    if len(trimmed) > max_size:
+        # Cut at a line boundary so no partial line is left at the end
+        cut = trimmed.rfind('\n', 0, max_size)
+        trimmed = trimmed[:cut if cut > 0 else max_size]
+
+    return trimmed
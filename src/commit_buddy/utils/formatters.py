@@ -1,9 +1,10 @@
 """
 Output formatting utilities for Commit Buddy.
 """
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any
 import os
 import re
+from collections import Counter
 
 from rich.console import Console
 from rich.panel import Panel
@@ -14,10 +15,14 @@ from rich.text import Text
 from rich.columns import Columns
 from rich.tree import Tree
 
-from commit_buddy.chains.change_splitter import LogicalChangeUnit
+if TYPE_CHECKING:
+    from commit_buddy.chains.change_splitter import LogicalChangeUnit
 
 console = Console()
 
+# Conventional commit type and optional scope, matched against a lowercased subject
+_CC_RE = re.compile(r'^(feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert)(\([a-z0-9_-]+\))?:')
+
 def format_diff_analysis(analysis: str) -> None:
     """
     Format and print a diff analysis.
@@ -31,7 +36,7 @@ def format_diff_analysis(analysis: str) -> None:
         border_style="blue"
     ))
 
-def format_logical_units(units: List[LogicalChangeUnit]) -> None:
+def format_logical_units(units: List["LogicalChangeUnit"]) -> None:
     """
     Format and print a list of logical change units.
 
@@ -90,12 +95,13 @@ def format_commit_message(message: str) -> None:
         # Format the first line (subject) differently
         subject = lines[0].strip()
 
-        # Find commit type and scope if present
-        match = re.match(r'^(feat|fix|docs|style|refactor|perf|test|build|ci|chore|revert)(\([a-z0-9_-]+\))?:', subject, re.IGNORECASE)
+        # Find commit type and scope if present; the match is ASCII-only, so its
+        # spans index the original subject and keep the author's casing
+        match = _CC_RE.match(subject.lower())
 
         if match:
-            type_part = match.group(1)
-            scope_part = match.group(2) or ""
+            type_part = subject[match.start(1):match.end(1)]
+            scope_part = subject[match.start(2):match.end(2)] if match.group(2) else ""
             # Extract the description (everything after the colon)
             colon_index = subject.find(':')
             if colon_index != -1 and colon_index + 1 < len(subject):
@@ -186,6 +192,23 @@ def format_file_diff(file_path: str, diff: str) -> None:
     console.print(f"[bold]File:[/bold] {file_path}")
     console.print(Syntax(diff, "diff", theme="monokai"))
 
+def _build_file_tree(file: str, changes: Dict[str, List[str]]) -> Tree:
+    """Build the tree of up to five added lines shown for one file."""
+    tree = Tree(f"[bold cyan]{file}[/bold cyan]")
+
+    if file in changes and changes[file]:
+        for change in changes[file][:5]:
+            if len(change) > 60:
+                change = change[:57] + "..."
+            tree.add(f"[green]+ {change}[/green]")
+
+        if len(changes[file]) > 5:
+            tree.add(f"[dim]... and {len(changes[file]) - 5} more changes[/dim]")
+    else:
+        tree.add("[dim]No content changes detected[/dim]")
+
+    return tree
+
 def format_file_changes_summary(files: List[str], changes: Dict[str, List[str]]) -> None:
     """
     Format and print a summary of file changes.
@@ -194,48 +217,26 @@ def format_file_changes_summary(files: List[str], changes: Dict[str, List[str]])
         files: List of file names
         changes: Dictionary of changes per file
     """
-    file_trees = []
-
-    for file in files:
-        tree = Tree(f"[bold cyan]{file}[/bold cyan]")
-
-        if file in changes and changes[file]:
-            for i, change in enumerate(changes[file][:5]):
-                if len(change) > 60:
-                    change = change[:57] + "..."
-                tree.add(f"[green]+ {change}[/green]")
-
-            if len(changes[file]) > 5:
-                tree.add(f"[dim]... and {len(changes[file]) - 5} more changes[/dim]")
-        else:
-            tree.add("[dim]No content changes detected[/dim]")
-
-        file_trees.append(tree)
-
-    # If many files, just show counts
+    # If many files, just show counts and build trees only for the files shown
     if len(files) > 10:
         console.print(f"[bold]Files changed:[/bold] {len(files)}")
-        # Group by extension
-        extensions = {}
-        for file in files:
-            ext = os.path.splitext(file)[1] or "(no extension)"
-            if ext not in extensions:
-                extensions[ext] = 0
-            extensions[ext] += 1
+
+        # Group by extension in a single pass over the files
+        extensions = Counter(os.path.splitext(file)[1] or "(no extension)" for file in files)
 
         ext_table = Table(title="Files by Type")
         ext_table.add_column("Extension", style="cyan")
         ext_table.add_column("Count", style="green")
 
-        for ext, count in sorted(extensions.items(), key=lambda x: x[1], reverse=True):
+        for ext, count in extensions.most_common():
             ext_table.add_row(ext, str(count))
 
         console.print(ext_table)
 
         # Just show first few files
-        for tree in file_trees[:5]:
-            console.print(tree)
+        for file in files[:5]:
+            console.print(_build_file_tree(file, changes))
         console.print(f"[dim]... and {len(files) - 5} more files[/dim]")
     else:
         # Show all files in a column layout
-        console.print(Columns(file_trees))
+        console.print(Columns([_build_file_tree(file, changes) for file in files]))
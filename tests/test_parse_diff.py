@@ -0,0 +1,29 @@
+"""
+Tests for parsing git diffs in the CLI.
+"""
+from commit_buddy.main import _parse_large_diff, parse_diff
+
+DIFF = (
+    "diff --git a/x.py b/x.py\n"
+    "--- a/x.py\n"
+    "+++ b/x.py\n"
+    "@@ -0,0 +1,3 @@\n"
+    "+hello  \n"
+    "+\n"
+    "+last\n"
+    "diff --git a/README.md b/README.md\n"
+    "--- a/README.md\n"
+    "+++ b/README.md\n"
+    "@@ -1 +1 @@\n"
+    "-old\n"
+    "+new"
+)
+
+def test_parse_diff_collects_files_and_added_lines():
+    files, changes = parse_diff(DIFF)
+
+    assert files == ["x.py", "README.md"]
+    assert changes == {"x.py": ["hello  ", "", "last"], "README.md": ["new"]}
+
+def test_large_diff_path_matches_line_loop():
+    assert _parse_large_diff(DIFF) == parse_diff(DIFF)
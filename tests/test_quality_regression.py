@@ -0,0 +1,59 @@
+"""
+Regression tests for commit message post-processing.
+
+These run fixed strings through the format check and the cleanup of raw
+replies; no model is loaded, so they say nothing about a model's output.
+"""
+import pytest
+
+from commit_buddy.chains.message_generator import (
+    is_conventional_commit_format,
+    validate_commit_message,
+)
+
+FILES = ["src/commit_buddy/main.py", "README.md"]
+
+# Messages that must be accepted as is
+VALID_MESSAGES = [
+    "feat: add streaming output",
+    "fix(cli): handle empty diffs",
+    "docs: describe quantization options",
+    "perf(diff): parse large diffs with regex scans",
+    "chore(deps): bump gitpython",
+    "refactor: share the lazy export helper\n\nKeeps the package imports cheap.",
+]
+
+# Messages that must be rejected
+INVALID_MESSAGES = [
+    "",
+    "Add streaming output",
+    "feature: add streaming output",
+    "feat add streaming output",
+    "feat:",
+    "fix(CLI Flags): handle empty diffs",
+]
+
+# Raw model replies that post-processing must turn into a valid message
+RAW_REPLIES = [
+    "feat: add streaming output",
+    "  fix: handle empty diffs\n",
+    "Commit message: docs: describe quantization options",
+    "`feat(cli): add --dry-run flag`",
+    "fix: handle empty diffs\n\nExample: feat(auth): add login",
+    "refactor: split diff parsing\n\nNow, generate a commit message for the changes above.",
+]
+
+@pytest.mark.parametrize("message", VALID_MESSAGES)
+def test_valid_messages_are_conventional(message):
+    assert is_conventional_commit_format(message)
+
+@pytest.mark.parametrize("message", INVALID_MESSAGES)
+def test_invalid_messages_are_rejected(message):
+    assert not is_conventional_commit_format(message)
+
+@pytest.mark.parametrize("reply", RAW_REPLIES)
+def test_raw_replies_validate_to_conventional_messages(reply):
+    message = validate_commit_message(reply, FILES)
+
+    assert message is not None
+    assert is_conventional_commit_format(message)